@@ -0,0 +1,210 @@
+import argparse
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+import data
+from cache import classify_url
+from constants import BENCH_ARCHIVE, BENCH_BASELINE, PFR_BASE_URL
+from fetch import Fetcher, MissingPageError
+from instrument import count_rows
+from parse import ParsePool
+from replay import PageArchive
+from schema import apply_schema
+
+# pages the fixture archive is recorded from (python bench.py --record); scrapers pull in the pages
+# they depend on, e.g. the roster scraper records the page of every player on the roster
+FIXTURE_URLS = [
+    f'{PFR_BASE_URL}/players/A/AlleJo02.htm',
+    f'{PFR_BASE_URL}/players/K/KuppCo00.htm',
+    f'{PFR_BASE_URL}/players/A/AlleJo02/gamelog',
+    f'{PFR_BASE_URL}/players/K/KuppCo00/gamelog',
+    f'{PFR_BASE_URL}/teams/buf/2021_roster.htm',
+    f'{PFR_BASE_URL}/teams/buf/2021/gamelog',
+    f'{PFR_BASE_URL}/teams/buf/coaches.htm',
+    f'{PFR_BASE_URL}/years/2021/draft.htm',
+    f'{PFR_BASE_URL}/awards/awards_2021.htm',
+    f'{PFR_BASE_URL}/years/2021/allpro.htm',
+    f'{PFR_BASE_URL}/years/2021/probowl.htm'
+]
+
+
+def _player_id(url: str) -> str:
+    return url.split('/')[-1][:-len('.htm')]
+
+
+def _team_year(url: str) -> tuple:
+    team, page = url.split('/')[-2:]
+    return team, int(page[:4])
+
+
+def _reference_season(name: str):
+    '''
+    Scrapes one season of a REFERENCE_TABLES table the way load_reference_table does, without
+    writing its partition, so the timings do not include disk I/O
+    '''
+    url, parser, cols = data.REFERENCE_TABLES[name]
+
+    def scrape(year: int) -> pd.DataFrame:
+        return apply_schema(pd.DataFrame.from_records(parser(data.get_fetcher().fetch(url.format(year=year)), year), columns=cols))
+
+    return scrape
+
+
+# scraper name -> (fixture url class, scraper, scraper args from fixture url)
+BENCHMARKS = {
+    'get_player_details': ('player', data.get_player_details, lambda url: (_player_id(url),)),
+    'get_player_seasons': ('player', data.get_player_seasons, lambda url: (_player_id(url),)),
+    'get_player_games': ('player_gamelog', data.get_player_games, lambda url: (url.split('/')[-2],)),
+    'get_transactions': ('player', data.get_transactions, lambda url: (_player_id(url),)),
+    'get_team_games': ('team_gamelog', data.get_team_games, lambda url: (url.split('/')[-3], int(url.split('/')[-2]))),
+    'get_team_coaches': ('team_coaches', data.get_team_coaches, lambda url: (url.split('/')[-2],)),
+    'get_team_roster': ('team_roster', data.get_team_roster, _team_year),
+    'get_draft_picks': ('draft', _reference_season('draft_picks'), lambda url: (classify_url(url)[1],)),
+    'get_awards': ('awards', _reference_season('awards'), lambda url: (classify_url(url)[1],)),
+    'get_all_pros': ('all_pro', _reference_season('all_pros'), lambda url: (classify_url(url)[1],)),
+    'get_pro_bowls': ('pro_bowl', _reference_season('pro_bowls'), lambda url: (classify_url(url)[1],)),
+    'scrape_player': ('player', data.scrape_player, lambda url: (_player_id(url),))
+}
+
+
+@contextmanager
+def offline(pages: dict):
+    '''
+    Runs scrapers against in-memory fixture pages, with parsing inline so it is what gets timed
+    '''
+    fetcher = data.set_fetcher(Fetcher(source=pages))
+    pool = data.set_parse_pool(ParsePool(0))
+    try:
+        yield
+    finally:
+        data.set_fetcher(fetcher)
+        data.set_parse_pool(pool)
+
+
+def run_benchmark(scraper, args_list: list, rounds: int) -> dict:
+    latencies = []
+    rows = 0
+    for i in range(rounds):
+        for args in args_list:
+            start = time.perf_counter()
+            result = scraper(*args)
+            latencies.append(time.perf_counter() - start)
+            if i == 0:
+                rows += count_rows(result)
+    # allocations are measured on a separate pass, tracing slows everything down
+    tracemalloc.start()
+    for args in args_list:
+        scraper(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    latencies = np.array(latencies) * 1000
+    total = latencies.sum() / 1000
+    return {
+        'pages': len(args_list),
+        'rows': rows,
+        'p50_ms': np.percentile(latencies, 50),
+        'p90_ms': np.percentile(latencies, 90),
+        'p99_ms': np.percentile(latencies, 99),
+        'pages_per_s': len(latencies) / total if total else np.nan,
+        'rows_per_s': rows * rounds / total if total else np.nan,
+        'peak_kb': peak / 1024
+    }
+
+
+def run_benchmarks(archive_path: str = BENCH_ARCHIVE,
+                   rounds: int = 5,
+                   scrapers: list = None,
+                   baseline_path: str = BENCH_BASELINE,
+                   save_baseline: bool = False,
+                   tolerance: float = 0.2) -> pd.DataFrame:
+    '''
+    Times every scraper over the fixture pages of its url class in a recorded PageArchive and
+    compares against the baseline file. A scraper regresses when its median latency or peak
+    allocations exceed the baseline by more than tolerance, or it produces different row counts.
+    '''
+    if not os.path.exists(archive_path):
+        raise FileNotFoundError(f'no fixture archive at {archive_path}, record one with python bench.py --record')
+    with PageArchive(archive_path) as archive:
+        pages = {url: archive.get(url) for url in archive.urls()}
+    results = {}
+    with offline(pages):
+        for name, (url_class, scraper, get_args) in BENCHMARKS.items():
+            if scrapers is not None and name not in scrapers:
+                continue
+            args_list = [get_args(url) for url in pages if classify_url(url)[0] == url_class]
+            if not args_list:
+                print(f'no {url_class} fixtures, skipping {name}')
+                continue
+            try:
+                results[name] = run_benchmark(scraper, args_list, rounds)
+            except MissingPageError as e:
+                print(f'{name} needs a page the fixture archive does not have, skipping it ({e})')
+    report = pd.DataFrame.from_dict(results, orient='index')
+    baseline = {}
+    if os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result['p50_ms'] > base['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {result['p50_ms']:.2f}ms vs baseline {base['p50_ms']:.2f}ms")
+        if result['peak_kb'] > base['peak_kb'] * (1 + tolerance):
+            regressions.append(f"{name}: peak {result['peak_kb']:.0f}KB vs baseline {base['peak_kb']:.0f}KB")
+        if result['rows'] != base['rows']:
+            regressions.append(f"{name}: {result['rows']} rows vs baseline {base['rows']}")
+    if baseline:
+        report['baseline_p50_ms'] = [baseline.get(name, {}).get('p50_ms', np.nan) for name in report.index]
+    print(report.round(2).to_string())
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    if save_baseline:
+        os.makedirs(os.path.dirname(baseline_path) or '.', exist_ok=True)
+        with open(baseline_path, 'w') as f:
+            json.dump({**baseline, **{name: {key: float(value) for key, value in result.items()} for name, result in results.items()}}, f, indent=2)
+    return report
+
+
+def record_fixtures(archive_path: str = BENCH_ARCHIVE, urls: list = FIXTURE_URLS) -> int:
+    '''
+    Records the fixture archive from PFR by running every benchmark once on its fixture urls, so
+    the pages each scraper depends on are recorded too. Requests go through the usual rate limit,
+    urls that fail are reported and left out. Returns the number of pages in the archive.
+    '''
+    os.makedirs(os.path.dirname(archive_path) or '.', exist_ok=True)
+    with PageArchive(archive_path) as archive:
+        fetcher = data.set_fetcher(Fetcher(archive=archive))
+        try:
+            for name, (url_class, scraper, get_args) in BENCHMARKS.items():
+                for url in urls:
+                    if classify_url(url)[0] == url_class:
+                        try:
+                            scraper(*get_args(url))
+                        except Exception as e:
+                            print(f'could not record {name} fixtures | url = {url} | {e!r}')
+        finally:
+            data.set_fetcher(fetcher)
+        return len(archive)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the PFR scrapers over recorded fixture pages')
+    parser.add_argument('--archive', default=BENCH_ARCHIVE)
+    parser.add_argument('--record', action='store_true', help='record the fixture archive from PFR first')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--baseline', default=BENCH_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('scrapers', nargs='*')
+    args = parser.parse_args()
+    if args.record:
+        print(f'recorded {record_fixtures(args.archive)} pages to {args.archive}')
+    run_benchmarks(args.archive, args.rounds, args.scrapers or None, args.baseline, args.save_baseline, args.tolerance)
@@ -0,0 +1,184 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import date
+
+from constants import PAGE_CACHE_DIR
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# url classes, checked in order; a named 'year' group marks the season a page belongs to
+URL_CLASSES = [
+    ('player_gamelog', re.compile(r'/players/[A-Za-z]/[^/]+/gamelog')),
+    ('player', re.compile(r'/players/[A-Za-z]/[^/]+\.htm')),
+    ('team_gamelog', re.compile(r'/teams/[a-z]{3}/(?P<year>[0-9]{4})/gamelog')),
+    ('team_roster', re.compile(r'/teams/[a-z]{3}/(?P<year>[0-9]{4})_roster\.htm')),
+    ('team_season', re.compile(r'/teams/[a-z]{3}/(?P<year>[0-9]{4})\.htm')),
+    ('team_coaches', re.compile(r'/teams/[a-z]{3}/coaches\.htm')),
+    ('draft', re.compile(r'/years/(?P<year>[0-9]{4})/draft\.htm')),
+    ('all_pro', re.compile(r'/years/(?P<year>[0-9]{4})/allpro\.htm')),
+    ('pro_bowl', re.compile(r'/years/(?P<year>[0-9]{4})/probowl\.htm')),
+    ('fantasy', re.compile(r'/years/(?P<year>[0-9]{4})/fantasy\.htm')),
+    ('awards', re.compile(r'/awards/awards_(?P<year>[0-9]{4})\.htm'))
+]
+
+# max age in seconds for pages that can still change, i.e. current season pages and pages
+# spanning multiple seasons; pages from completed seasons never expire
+PAGE_TTLS = {
+    'player_gamelog': 6 * HOUR,
+    'player': 12 * HOUR,
+    'team_gamelog': 6 * HOUR,
+    'team_roster': 12 * HOUR,
+    'team_season': 6 * HOUR,
+    'team_coaches': DAY,
+    'draft': DAY,
+    'all_pro': DAY,
+    'pro_bowl': DAY,
+    'fantasy': 6 * HOUR,
+    'awards': DAY,
+    'other': 6 * HOUR
+}
+
+
+def current_season(today: date = None) -> int:
+    '''
+    NFL season in progress, seasons roll over in March after the Super Bowl
+    '''
+    today = today or date.today()
+    return today.year if today.month >= 3 else today.year - 1
+
+
+def classify_url(url: str) -> tuple:
+    '''
+    Returns (url class, season year or None) for a PFR url
+    '''
+    for url_class, pattern in URL_CLASSES:
+        match = pattern.search(url)
+        if match:
+            year = match.groupdict().get('year')
+            return url_class, int(year) if year else None
+    return 'other', None
+
+
+def url_key(url: str) -> str:
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+
+class PageCache:
+    '''
+    Content-addressed on-disk HTML cache. Each url gets a small JSON index entry pointing to a
+    gzipped page blob named by the sha256 of its content, so identical pages are stored once.
+    '''
+
+    def __init__(self, root: str = PAGE_CACHE_DIR, ttls: dict = None):
+        self.root = root
+        self.ttls = {**PAGE_TTLS, **(ttls or {})}
+
+    def _index_path(self, url: str) -> str:
+        key = url_key(url)
+        return os.path.join(self.root, 'index', key[:2], f'{key}.json')
+
+    def _page_path(self, digest: str) -> str:
+        return os.path.join(self.root, 'pages', digest[:2], f'{digest}.html.gz')
+
+    def ttl(self, url: str) -> float or None:
+        '''
+        Max age in seconds for a url, None if the page never expires
+        '''
+        url_class, year = classify_url(url)
+        if year is not None and year < current_season():
+            return None
+        return self.ttls.get(url_class, self.ttls['other'])
+
+    def lookup(self, url: str) -> dict or None:
+        try:
+            with open(self._index_path(url)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry: dict, now: float = None) -> bool:
+        ttl = self.ttl(entry['url'])
+        if ttl is None:
+            return True
+        return (now or time.time()) - entry['fetched_at'] < ttl
+
+    def get(self, url: str, stale: bool = False) -> bytes or None:
+        '''
+        Returns cached html for a url, or None if missing or expired (unless stale=True)
+        '''
+        entry = self.lookup(url)
+        if entry is None or (not stale and not self.is_fresh(entry)):
+            return None
+        try:
+            with gzip.open(self._page_path(entry['sha256']), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, url: str, html: bytes, **meta) -> dict:
+        digest = hashlib.sha256(html).hexdigest()
+        page_path = self._page_path(digest)
+        if not os.path.exists(page_path):
+            _write_atomic(page_path, gzip.compress(html))
+        url_class, year = classify_url(url)
+        entry = {
+            **meta,
+            'url': url,
+            'url_class': url_class,
+            'year': year,
+            'sha256': digest,
+            'size': len(html),
+            'fetched_at': time.time()
+        }
+        _write_atomic(self._index_path(url), json.dumps(entry).encode('utf-8'))
+        return entry
+
+    def touch(self, url: str) -> dict or None:
+        '''
+        Marks a cached page as just fetched, e.g. after a 304 confirmed it is unchanged
+        '''
+        entry = self.lookup(url)
+        if entry is None:
+            return None
+        entry['fetched_at'] = time.time()
+        _write_atomic(self._index_path(url), json.dumps(entry).encode('utf-8'))
+        return entry
+
+    def invalidate(self, url: str):
+        try:
+            os.remove(self._index_path(url))
+        except OSError:
+            pass
+
+    def entries(self, url_class: str = None):
+        '''
+        Iterates index entries for every cached url, optionally limited to one url class
+        '''
+        index_dir = os.path.join(self.root, 'index')
+        if not os.path.isdir(index_dir):
+            return
+        for dirpath, _, filenames in os.walk(index_dir):
+            for filename in sorted(filenames):
+                if not filename.endswith('.json'):
+                    continue
+                try:
+                    with open(os.path.join(dirpath, filename)) as f:
+                        entry = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if url_class is None or entry.get('url_class') == url_class:
+                    yield entry
+
+
+def _write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
@@ -5,3 +5,52 @@ SCRAPE_PLAYER_COUNT = 10
 
 # number of games to include in stat window for rolling per-game stats
 STAT_LOOKBACK_GAMES = 24
+
+# directory for the on-disk PFR page cache
+PAGE_CACHE_DIR = "cache"
+
+# origin every scraped page url starts with
+PFR_BASE_URL = "https://www.pro-football-reference.com"
+
+# PFR asks scrapers to stay under 20 requests per minute
+PFR_REQUESTS_PER_MINUTE = 20
+
+# retries per page for throttled (429) and failed (5xx, timeout) requests
+FETCH_MAX_RETRIES = 4
+
+# exponential backoff in seconds between retries: base * 2^failures, capped, with full jitter
+BACKOFF_BASE = 2
+BACKOFF_CAP = 120
+
+# consecutive failed requests that open the circuit, and seconds it stays open
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 300
+
+# worker threads available to the page fetcher
+FETCH_WORKERS = 4
+
+# seconds to wait for a PFR connection and for response data
+HTTP_CONNECT_TIMEOUT = 10
+HTTP_READ_TIMEOUT = 30
+
+# worker processes for html parsing, None uses every core
+PARSE_WORKERS = None
+
+# directory for the year-partitioned awards, draft, All-Pro and Pro Bowl tables
+REFERENCE_DIR = "reference"
+
+# directory for scrape_master's work journal and checkpointed unit outputs
+SCRAPE_DIR = "scrape"
+
+# attempts per scrape unit before it is left failed until explicitly retried
+SCRAPE_MAX_ATTEMPTS = 3
+
+# seconds before a unit claimed by a scrape worker that never finished it is handed out again
+SCRAPE_LEASE = 3600
+
+# local worker processes started by scrape_sharded
+SCRAPE_WORKERS = 4
+
+# recorded fixture pages and latency baseline used by bench.py, and where it writes reference partitions
+BENCH_ARCHIVE = "bench/pages.zip"
+BENCH_BASELINE = "bench/baseline.json"
@@ -1,13 +1,25 @@
 import json
+import multiprocessing
+import os
 import re
+import socket
 import time
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from bs4 import BeautifulSoup, Comment
-from urllib.request import urlopen
-
-from constants import SCRAPE_PLAYER_COUNT
+from bs4 import BeautifulSoup
+
+from cache import PageCache, current_season
+from constants import REFERENCE_DIR, SCRAPE_DIR, SCRAPE_PLAYER_COUNT, SCRAPE_WORKERS
+from fetch import Fetcher, SharedRateBudget
+from instrument import traced
+from journal import ScrapeJournal
+from keys import add_keys, decode_keys, encode_keys, has_keys, load_keymaps, locked_keymaps
+from parse import Col, CommentIndex, ParsePool, extract_row, make_soup, row_cells
+from partitions import PartitionWriter, read_partitions
+from schema import apply_schema, table_schema
+from storage import TABLE_FORMATS, read_frame, stored_format, table_path, write_frame
+from tables import PlayerRegistry, TableBuffer
 
 SKILL_POSITIONS = [
     'QB',
@@ -41,6 +53,52 @@ OL_POSITIONS = [
 
 OFFENSIVE_POSITIONS = SKILL_POSITIONS + OL_POSITIONS
 
+# shared by every scraper, built on first use so importing data opens no cache and starts no workers
+_PAGE_CACHE = None
+_FETCHER = None
+_PARSE_POOL = None
+
+
+def get_page_cache() -> PageCache:
+    global _PAGE_CACHE
+    if _PAGE_CACHE is None:
+        _PAGE_CACHE = PageCache()
+    return _PAGE_CACHE
+
+
+def get_fetcher() -> Fetcher:
+    global _FETCHER
+    if _FETCHER is None:
+        _FETCHER = Fetcher(cache=get_page_cache())
+    return _FETCHER
+
+
+def set_fetcher(fetcher: Fetcher or None) -> Fetcher or None:
+    '''
+    Points every scraper at another fetcher, e.g. one replaying a page archive or talking to a
+    local ReplayServer. Returns the previous one, None restores the default.
+    '''
+    global _FETCHER
+    previous, _FETCHER = _FETCHER, fetcher
+    return previous
+
+
+def get_parse_pool() -> ParsePool:
+    global _PARSE_POOL
+    if _PARSE_POOL is None:
+        _PARSE_POOL = ParsePool()
+    return _PARSE_POOL
+
+
+def set_parse_pool(pool: ParsePool or None) -> ParsePool or None:
+    '''
+    Parses every scraper's pages on another pool, e.g. ParsePool(0) to parse inline. Returns the
+    previous one, None restores the default.
+    '''
+    global _PARSE_POOL
+    previous, _PARSE_POOL = _PARSE_POOL, pool
+    return previous
+
 PLAYER_COLS = [
     'id',
     'position',
@@ -182,6 +240,115 @@ PRO_BOWL_COLS = [
     'player'
 ]
 
+# dtypes the scrapers and FFData enforce on each stored table, see schema.py
+TABLE_SCHEMAS = {
+    'players': table_schema(PLAYER_COLS),
+    'player_seasons': table_schema(PLAYER_SEASON_COLS),
+    'player_games': table_schema(PLAYER_GAME_COLS),
+    'transactions': table_schema(TRANSACTION_COLS),
+    'team_seasons': table_schema(TEAM_SEASON_COLS),
+    'team_games': table_schema(TEAM_GAME_COLS),
+    'team_coaches': table_schema(TEAM_COACH_COLS),
+    'rosters': table_schema(TEAM_ROSTER_COLS),
+    'draft_picks': table_schema(DRAFT_PICK_COLS),
+    'awards': table_schema(AWARD_COLS),
+    'all_pros': table_schema(ALL_PRO_COLS),
+    'pro_bowls': table_schema(PRO_BOWL_COLS)
+}
+
+
+def normalize_position(text: str) -> str:
+    position = text.upper()
+    return 'OL' if position in OL_POSITIONS else position
+
+
+def parse_game_result(text: str) -> tuple:
+    '''
+    'W 24-17' -> ('W', 24, 17)
+    '''
+    result, score = text.split()[:2]
+    team_score, opp_score = score.split('-')
+    return result.upper(), int(team_score), int(opp_score)
+
+
+def parse_time_of_poss(text: str) -> int:
+    '''
+    '31:20' -> seconds
+    '''
+    mins, secs = text.split(':')
+    return int(mins) * 60 + int(secs)
+
+
+PLAYER_GAME_ROW_ID = re.compile('stats.[0-9]')
+
+# cells backing PLAYER_GAME_COLS; player, active and dnp_reason are set by the parser and
+# result, team_score and opp_score all come from the game_result cell
+PLAYER_GAME_SPEC = {
+    'year': Col('year_id', int),
+    'date': Col('game_date', blank=''),
+    'game_num': Col('game_num', blank=''),
+    'week_num': Col('week_num', blank=''),
+    'team': Col('team', str.lower, href=2),
+    'opp': Col('opp', str.lower, href=2),
+    'home': Col('game_location', lambda text: text != '@', blank=True),
+    'start': Col('gs', lambda text: text == '*', blank=False),
+    'pass_comp': Col('pass_cmp', int, 0),
+    'pass_att': Col('pass_att', int, 0),
+    'pass_yd': Col('pass_yds', int, 0),
+    'pass_td': Col('pass_td', int, 0),
+    'pass_int': Col('pass_int', int, 0),
+    'qb_rate': Col('pass_rating', float, 0.),
+    'rush_att': Col('rush_att', int, 0),
+    'rush_yd': Col('rush_yds', int, 0),
+    'rush_td': Col('rush_td', int, 0),
+    'rec': Col('rec', int, 0),
+    'rec_tgt': Col('targets', int, 0),
+    'rec_yd': Col('rec_yds', int, 0),
+    'rec_td': Col('rec_td', int, 0)
+}
+
+# stat columns, zeroed for games the player did not play
+PLAYER_GAME_STAT_COLS = PLAYER_GAME_COLS[PLAYER_GAME_COLS.index('pass_comp'):]
+
+GAME_RESULT_COL = Col('game_result', parse_game_result, (np.nan, np.nan, np.nan))
+
+DNP_REASON_COL = Col('reason', lambda text: '_'.join(text.lower().split()), blank='')
+
+# cells backing TEAM_GAME_COLS; team, year, game_num and opp_top are set by the parser
+TEAM_GAME_SPEC = {
+    'date': Col('game_date', attr='csk'),
+    'week_num': Col('week_num', int),
+    'opp': Col('opp', str.lower, href=2),
+    'home': Col('game_location', lambda text: text != '@', blank=True),
+    'result': Col('game_outcome', str.upper, blank=''),
+    'team_score': Col('pts_off', int),
+    'opp_score': Col('pts_def', int),
+    'pass_comp': Col('pass_cmp', int, 0),
+    'pass_att': Col('pass_att', int, 0),
+    'pass_yd': Col('pass_yds', int, 0),
+    'pass_td': Col('pass_td', int, 0),
+    'pass_int': Col('pass_int', int, 0),
+    'qb_rate': Col('pass_rating', float, 0.),
+    'sack': Col('pass_sacked', int, 0),
+    'rush_att': Col('rush_att', int, 0),
+    'rush_yd': Col('rush_yds', int, 0),
+    'rush_td': Col('rush_td', int, 0),
+    'team_top': Col('time_of_poss', parse_time_of_poss),
+    'fourth_down_att': Col('fourth_down_att', int),
+    'fourth_down_conv': Col('fourth_down_success', int),
+    'third_down_att': Col('third_down_att', int),
+    'third_down_conv': Col('third_down_success', int)
+}
+
+# cells backing DRAFT_PICK_COLS; year and player are set by the parser
+DRAFT_PICK_SPEC = {
+    'round': Col('draft_round', int),
+    'pick': Col('draft_pick', int),
+    'team': Col('team', str.lower, href=2),
+    'age': Col('age', int),
+    'position': Col('pos', normalize_position, blank='')
+}
+
 TEAMS = [
     'buf',
     'mia',
@@ -429,100 +596,569 @@ TRAIN_COLS_TE = [
 ]
 
 
+# csv file and index column of each stored FFData table
+FFDATA_TABLES = {
+    'players': ('players.csv', 0),
+    'player_seasons': ('player_seasons.csv', 0),
+    'player_games': ('player_games.csv', 0),
+    'all_pros': ('all_pros.csv', 0),
+    'awards': ('awards.csv', 0),
+    'draft_picks': ('draft_picks.csv', None),
+    'team_seasons': ('team_seasons.csv', 0),
+    'team_games': ('team_games_new.csv', 0),
+    'team_coaches': ('team_coaches.csv', None),
+    'rosters': ('rosters.csv', None),
+    'pro_bowls': ('pro_bowls.csv', 0),
+    'transactions': ('transactions.csv', 0),
+    'draft_pick_values': ('draft_pick_values.csv', 0)
+}
+
+# the largest tables, worth storing in the memory-mapped arrow format
+GAME_TABLES = ['player_games', 'team_games']
+
+
+class LazyTable:
+    '''
+    FFData table read from csv_dir on first access and cached on the instance, so later reads
+    (and assignments) use the instance attribute directly
+    '''
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        df = read_table(self.name, obj.csv_dir, obj.format, obj.keymaps)
+        obj.__dict__[self.name] = df
+        return df
+
+
 class FFData:
-    def __init__(self):
-        self.players = pd.read_csv('csv/players.csv', index_col=0)
-        self.player_seasons = pd.read_csv('csv/player_seasons.csv', index_col=0)
-        self.player_games = pd.read_csv('csv/player_games.csv', index_col=0)
-        self.all_pros = pd.read_csv('csv/all_pros.csv', index_col=0)
-        self.awards = pd.read_csv('csv/awards.csv', index_col=0)
-        self.draft_picks = pd.read_csv('csv/draft_picks.csv')
-        self.team_seasons = pd.read_csv('csv/team_seasons.csv', index_col=0)
-        self.team_games = pd.read_csv('csv/team_games_new.csv', index_col=0)
-        self.team_coaches = pd.read_csv('csv/team_coaches.csv')
-        self.rosters = pd.read_csv('csv/rosters.csv')
-        self.pro_bowls = pd.read_csv('csv/pro_bowls.csv', index_col=0)
-        self.transactions = pd.read_csv('csv/transactions.csv', index_col=0)
-        self.draft_pick_values = pd.read_csv('csv/draft_pick_values.csv', index_col=0)
+    players = LazyTable()
+    player_seasons = LazyTable()
+    player_games = LazyTable()
+    all_pros = LazyTable()
+    awards = LazyTable()
+    draft_picks = LazyTable()
+    team_seasons = LazyTable()
+    team_games = LazyTable()
+    team_coaches = LazyTable()
+    rosters = LazyTable()
+    pro_bowls = LazyTable()
+    transactions = LazyTable()
+    draft_pick_values = LazyTable()
+
+    def __init__(self, csv_dir: str = 'csv', format: str = None, keys: bool = False):
+        '''
+        Tables are read from csv_dir in the given format, by default in whichever format each
+        was last written, so tables converted with convert_tables() load as parquet.
+
+        With keys=True the player, team, opp and coach columns of every table hold integer keys
+        (player_key, team_key, opp_key, coach_key) and the string ids live only in the keymaps
+        (and the players table's id column), see key() and label(). By default tables keep the
+        string ids. Keys are handed out by write_table() (or update_keys() for older tables),
+        ids without one are MISSING_KEY.
+
+        Tables converted to the arrow format (e.g. the GAME_TABLES) are memory-mapped, their
+        numeric columns are read-only, copy() a table before changing it in place. Only with
+        keys=True is opening them near-instant with pages shared between processes on one
+        machine, by default their keys are decoded into freshly built string id columns.
+        '''
+        self.csv_dir = csv_dir
+        self.format = format
+        self.keymaps = load_keymaps(csv_dir) if keys else None
         self.train_base = pd.DataFrame(columns=TRAIN_COLS_BASE)
 
-
-def scrape_master(start_year: int = 1996, end_year: int = 2022) -> dict:
-    roster_df = pd.DataFrame(columns=TEAM_ROSTER_COLS)
-    player_df = pd.DataFrame(columns=PLAYER_COLS)
-    player_season_df = pd.DataFrame(columns=PLAYER_SEASON_COLS)
-    player_game_df = pd.DataFrame(columns=PLAYER_GAME_COLS)
-    transaction_df = pd.DataFrame(columns=TRANSACTION_COLS)
-    team_coach_df = pd.DataFrame(columns=TEAM_COACH_COLS)
-    team_season_df = pd.DataFrame(columns=TEAM_SEASON_COLS)
-    team_game_df = pd.DataFrame(columns=TEAM_GAME_COLS)
+    def preload(self, names: list = None) -> 'FFData':
+        '''
+        Reads the given tables (every table by default) up front, e.g. for batch jobs
+        '''
+        for name in names or FFDATA_TABLES:
+            getattr(self, name)
+        return self
+
+    def loaded(self) -> list:
+        return [name for name in FFDATA_TABLES if name in self.__dict__]
+
+    def key(self, kind: str, value: str) -> int:
+        '''
+        Integer key of a 'player', 'team' or 'coach' string id
+        '''
+        return self.keymaps[kind].key(value)
+
+    def label(self, kind: str, keys) -> np.ndarray:
+        '''
+        String ids of an array of 'player', 'team' or 'coach' keys, for display
+        '''
+        return self.keymaps[kind].decode(keys)
+
+
+def read_table(name: str, csv_dir: str = 'csv', format: str = None, keymaps: dict = None) -> pd.DataFrame:
+    '''
+    Reads a stored FFData table with its TABLE_SCHEMAS dtypes, format None picks the format it
+    was last written in. With keymaps the string id columns come back as integer keys (see
+    keys.py), ids without a key are MISSING_KEY. Without them the keys of arrow tables are
+    turned back into string ids, which copies those columns out of the memory map. Reading never
+    hands out keys, write_table() does.
+    '''
+    file, index_col = FFDATA_TABLES[name]
+    format = format or stored_format(csv_dir, file) or 'csv'
+    df = read_frame(table_path(csv_dir, file, format), format, index_col is not None)
+    if keymaps is not None:
+        df = encode_keys(df, keymaps, drop=True)
+    elif has_keys(df):
+        df = decode_keys(df, load_keymaps(csv_dir))
+    return apply_schema(df, TABLE_SCHEMAS.get(name, {}))
+
+
+def write_table(name: str, df: pd.DataFrame, csv_dir: str = 'csv', format: str = None):
+    '''
+    Stores an FFData table, format None keeps the format it is already stored in (csv for a new
+    table). New ids in the table get their keys here. Arrow tables store integer keys in place
+    of the string ids, so that a memory-mapped table has (almost) no columns that need copying,
+    the other formats store the string ids.
+    '''
+    file, index_col = FFDATA_TABLES[name]
+    format = format or stored_format(csv_dir, file) or 'csv'
+    # the keymaps are stored before the table, so readers can always decode its keys
+    with locked_keymaps(csv_dir) as keymaps:
+        if has_keys(df):
+            df = decode_keys(df, keymaps)
+        if format == 'arrow':
+            df = encode_keys(df, keymaps, drop=True, add=True)
+        else:
+            add_keys(df, keymaps)
+    write_frame(apply_schema(df, TABLE_SCHEMAS.get(name, {})), table_path(csv_dir, file, format), format, index_col is not None)
+
+
+def convert_tables(csv_dir: str = 'csv', format: str = 'parquet', names: list = None) -> list:
+    '''
+    One-shot conversion of the stored csv tables to parquet, feather or arrow next to them, e.g.
+    convert_tables(format='arrow', names=GAME_TABLES) for a memory-mapped game store. FFData then
+    reads the converted files, the csv files are left in place. Returns the converted table names.
+    '''
+    if format not in TABLE_FORMATS:
+        raise ValueError(f'unknown table format {format!r}, expected one of {TABLE_FORMATS}')
+    converted = []
+    for name in names or FFDATA_TABLES:
+        file, _ = FFDATA_TABLES[name]
+        if not os.path.exists(table_path(csv_dir, file, 'csv')):
+            continue
+        write_table(name, read_table(name, csv_dir, 'csv'), csv_dir, format)
+        converted.append(name)
+    return converted
+
+
+def update_keys(csv_dir: str = 'csv', names: list = None) -> list:
+    '''
+    Gives the ids of stored tables (every table by default) that have no key yet their keys,
+    e.g. for tables written before keys were introduced. Returns the names of the tables read.
+    '''
+    names = [name for name in names or FFDATA_TABLES if stored_format(csv_dir, FFDATA_TABLES[name][0])]
+    with locked_keymaps(csv_dir) as keymaps:
+        for name in names:
+            add_keys(read_table(name, csv_dir), keymaps)
+    return names
+
+
+# tables returned by scrape_master, in the order units are journaled
+MASTER_TABLE_COLS = {
+    'roster_df': TEAM_ROSTER_COLS,
+    'player_df': PLAYER_COLS,
+    'player_season_df': PLAYER_SEASON_COLS,
+    'player_game_df': PLAYER_GAME_COLS,
+    'transaction_df': TRANSACTION_COLS,
+    'team_coach_df': TEAM_COACH_COLS,
+    'team_season_df': TEAM_SEASON_COLS,
+    'team_game_df': TEAM_GAME_COLS,
+    'award_df': AWARD_COLS,
+    'draft_pick_df': DRAFT_PICK_COLS,
+    'all_pro_df': ALL_PRO_COLS,
+    'pro_bowl_df': PRO_BOWL_COLS
+}
+
+PLAYER_TABLES = ['player_df', 'player_season_df', 'player_game_df', 'transaction_df']
+
+# player game columns a streaming scrape keeps in memory for the roster week 1 check
+ROSTER_CHECK_COLS = ['player', 'year', 'team', 'week_num']
+
+# stored tables refreshed by scrape_delta and the key columns rows are upserted on
+DELTA_KEYS = {
+    'players': ['id'],
+    'player_seasons': ['player', 'year', 'team'],
+    'player_games': ['player', 'date'],
+    'transactions': ['player', 'date', 'txn_type'],
+    'team_games': ['team', 'date'],
+    'rosters': ['team', 'year', 'player']
+}
+
+DELTA_TABLES = list(DELTA_KEYS)
+
+
+def scrape_master(start_year: int = 1996,
+                  end_year: int = 2022,
+                  scrape_dir: str = SCRAPE_DIR,
+                  retry_failed: bool = False,
+                  out_dir: str = None,
+                  out_format: str = 'parquet') -> dict or None:
+    '''
+    Scrapes every team and season. Work is journaled in scrape_dir as (team, year, stage) units
+    with checkpointed outputs, so calling again with the same scrape_dir resumes where an
+    interrupted scrape left off. retry_failed=True re-runs units that used up their attempts.
+
+    With out_dir set the scrape streams instead: each unit's tables are written to year/team
+    partitioned parquet (or feather) files under out_dir as soon as the unit finishes, scraped
+    player rows are not held in memory, and nothing is returned.
+    '''
+    journal = ScrapeJournal(scrape_dir, 'master')
+    if retry_failed:
+        journal.retry_failed()
+    writer = PartitionWriter(out_dir, out_format) if out_dir is not None else None
+
+    def run(team: str, year: int, stage: str, scrape) -> dict or None:
+        tables = journal.run(team, year, stage, scrape)
+        if tables is not None and writer is not None:
+            writer.write_unit(team, year, {name: apply_schema(df) for name, df in tables.items()})
+        return tables
+
+    journal.add(master_units(start_year, end_year))
     print('executing scrape_master()...')
-    award_df = get_awards()
-    draft_pick_df = get_draft_picks()
-    all_pro_df = get_all_pros()
-    pro_bowl_df = get_pro_bowls()
+    run('nfl', 0, 'awards', lambda: {'award_df': get_awards()})
+    run('nfl', 0, 'draft_picks', lambda: {'draft_pick_df': get_draft_picks()})
+    run('nfl', 0, 'all_pros', lambda: {'all_pro_df': get_all_pros()})
+    run('nfl', 0, 'pro_bowls', lambda: {'pro_bowl_df': get_pro_bowls()})
+    # players scraped by earlier runs are restored so they are not fetched again
+    player_tables = journal.load({name: MASTER_TABLE_COLS[name] for name in PLAYER_TABLES}, stages=['roster'])
+    buffers = {name: TableBuffer(MASTER_TABLE_COLS[name], player_tables[name]) for name in PLAYER_TABLES}
+    # rebuilt from the restored rows, their order follows the journal, not the order units ran in
+    registry = PlayerRegistry.from_frame(player_tables['player_df'], player_tables['player_game_df'])
+    if writer is not None:
+        # players are on disk already, only what the roster check reads stays in memory
+        for name in PLAYER_TABLES:
+            if name == 'player_game_df':
+                buffers[name].project(ROSTER_CHECK_COLS)
+            else:
+                buffers[name].rollback(0)
+        del player_tables
     for team in TEAMS:
-        team_coach_entry = get_team_coaches(team)
-        team_coach_df = pd.concat(
-            [team_coach_df, team_coach_entry],
-            ignore_index=True
-        )
-        team_season_entry = get_team_seasons(team)
-        team_season_df = pd.concat(
-            [team_season_df, team_season_entry],
-            ignore_index=True
-        )
+        # queue the pages of the team's unfinished units so they download while earlier pages are parsed
+        get_fetcher().prefetch([
+            url
+            for year in range(start_year, end_year + 1)
+            for stage, url in (
+                ('roster', f'https://www.pro-football-reference.com/teams/{team}/{year}_roster.htm'),
+                ('games', f'https://www.pro-football-reference.com/teams/{team}/{year}/gamelog')
+            )
+            if journal.is_runnable(team, year, stage)
+        ])
+        run(team, 0, 'coaches', lambda: {'team_coach_df': get_team_coaches(team)})
+        run(team, 0, 'seasons', lambda: {'team_season_df': get_team_seasons(team)})
         for year in range(start_year, end_year + 1):
-            try:
-                (roster_entry, player_df, player_season_df, player_game_df, transaction_df) = get_team_roster(
-                    team,
-                    year,
-                    player_df=player_df,
-                    player_game_df=player_game_df,
-                    player_season_df=player_season_df,
-                    transaction_df=transaction_df
-                )
-                roster_df = pd.concat(
-                    [roster_df, roster_entry],
-                    ignore_index=True
-                )
-            except:
-                continue
-            try:
-                team_game_entry = get_team_games(team, year)
-                team_game_df = pd.concat(
-                    [team_game_df, team_game_entry],
-                    ignore_index=True
+            if journal.is_runnable(team, year, 'games'):
+                team_gamelog_url = f'https://www.pro-football-reference.com/teams/{team}/{year}/gamelog'
+                team_game_future = get_parse_pool().submit_fetched(
+                    get_fetcher().submit(team_gamelog_url), parse_team_games, team, year
                 )
-            except:
-                continue
-    return {
-        'roster_df': roster_df,
-        'player_df': player_df,
-        'player_season_df': player_season_df,
-        'player_game_df': player_game_df,
-        'transaction_df': transaction_df,
-        'team_coach_df': team_coach_df,
-        'team_season_df': team_season_df,
-        'team_game_df': team_game_df,
-        'award_df': award_df,
-        'draft_pick_df': draft_pick_df,
-        'all_pro_df': all_pro_df,
-        'pro_bowl_df': pro_bowl_df
+
+            marks = {name: buffer.mark() for name, buffer in buffers.items()}
+
+            def scrape_roster() -> dict:
+                registry_mark = registry.mark()
+                try:
+                    roster_entry = scrape_team_roster(
+                        team,
+                        year,
+                        buffers['player_df'],
+                        buffers['player_season_df'],
+                        buffers['player_game_df'],
+                        buffers['transaction_df'],
+                        registry
+                    )
+                except:
+                    # players of a failed unit are not checkpointed, so forget them too
+                    for name, buffer in buffers.items():
+                        buffer.rollback(marks[name])
+                    registry.rollback(registry_mark)
+                    raise
+                # checkpoint only the players this unit scraped
+                return {
+                    'roster_df': roster_entry,
+                    **{name: buffer.frame(since=marks[name]) for name, buffer in buffers.items()}
+                }
+
+            run(team, year, 'roster', scrape_roster)
+            if writer is not None:
+                buffers['player_game_df'].project(ROSTER_CHECK_COLS, since=marks['player_game_df'])
+                for name in ('player_df', 'player_season_df', 'transaction_df'):
+                    buffers[name].rollback(marks[name])  # written out with the unit
+            run(team, year, 'games', lambda: {'team_game_df': pd.DataFrame.from_records(team_game_future.result())})
+    failed = journal.failed()
+    if not failed.empty:
+        print(f'{len(failed)} units failed, rerun with retry_failed=True to retry them:\n{failed}')
+    print(f'requests: {get_fetcher().limiter.report()}')
+    if writer is None:
+        return apply_schemas(journal.load(MASTER_TABLE_COLS), MASTER_TABLE_COLS)
+
+
+def master_units(start_year: int, end_year: int) -> list:
+    '''
+    The (team, year, stage) units of a full scrape, in the order they run
+    '''
+    units = [('nfl', 0, stage) for stage in ('awards', 'draft_picks', 'all_pros', 'pro_bowls')]
+    for team in TEAMS:
+        units += [(team, 0, 'coaches'), (team, 0, 'seasons')]
+        for year in range(start_year, end_year + 1):
+            units += [(team, year, 'roster'), (team, year, 'games')]
+    return units
+
+
+# tables checkpointed by scrape_sharded units; roster candidates become roster_df rows once
+# their players' games are known
+SHARD_TABLE_COLS = {**MASTER_TABLE_COLS, 'roster_candidate_df': TEAM_ROSTER_COLS}
+
+
+def scrape_sharded(start_year: int = 1996,
+                   end_year: int = 2022,
+                   scrape_dir: str = SCRAPE_DIR,
+                   workers: int = SCRAPE_WORKERS,
+                   retry_failed: bool = False) -> dict:
+    '''
+    scrape_master spread over several worker processes. The journal in scrape_dir is the work
+    queue: workers claim (team, year) units, and each roster unit queues one unit per player, so
+    a player on several rosters is fetched once, by whichever worker claims them. All workers
+    draw on one request budget kept in scrape_dir, so together they stay within the PFR rate
+    limit while parsing and DataFrame work runs on every core. Workers on other machines that
+    mount scrape_dir can join with scrape_worker(scrape_dir). The units are not interchangeable
+    with scrape_master's, so neither runs on a journal the other created.
+    '''
+    journal = ScrapeJournal(scrape_dir, 'sharded')
+    if retry_failed:
+        journal.retry_failed()
+    journal.add(master_units(start_year, end_year))
+    print(f'executing scrape_sharded() with {workers} workers...')
+    # spawn so workers never inherit locks held by the fetcher threads
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=scrape_worker, args=(scrape_dir,)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    failed = journal.failed()
+    if not failed.empty:
+        print(f'{len(failed)} units failed, rerun with retry_failed=True to retry them:\n{failed}')
+    tables = journal.load(SHARD_TABLE_COLS)
+    candidates = tables.pop('roster_candidate_df')
+    tables['roster_df'] = pd.concat(
+        [tables['roster_df'], filter_roster(candidates, tables['player_game_df'])],
+        ignore_index=True
+    )
+    return apply_schemas(tables, MASTER_TABLE_COLS)
+
+
+def apply_schemas(tables: dict, table_cols: dict) -> dict:
+    '''
+    Casts each table of a scrape result to the dtypes of its columns
+    '''
+    return {name: apply_schema(df, table_schema(table_cols[name])) for name, df in tables.items()}
+
+
+def scrape_worker(scrape_dir: str = SCRAPE_DIR, worker_id: str = None, poll: float = 1.):
+    '''
+    Claims and runs scrape_sharded units from the journal in scrape_dir until none are left.
+    Requests go through the rate budget shared in scrape_dir, and pages are parsed inline since
+    the workers themselves are the parallelism.
+    '''
+    worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+    journal = ScrapeJournal(scrape_dir, 'sharded')
+    get_fetcher().limiter.budget = SharedRateBudget(os.path.join(scrape_dir, 'budget.sqlite'))
+    set_parse_pool(ParsePool(0))
+
+    def scrape_roster(team: str, year: int) -> dict:
+        roster_df = scrape_roster_candidates(team, year)
+        # queued once however many rosters the player is on
+        journal.add([(player_id, 0, 'player') for player_id in roster_df.player])
+        return {'roster_candidate_df': roster_df}
+
+    stages = {
+        'awards': lambda team, year: {'award_df': get_awards()},
+        'draft_picks': lambda team, year: {'draft_pick_df': get_draft_picks()},
+        'all_pros': lambda team, year: {'all_pro_df': get_all_pros()},
+        'pro_bowls': lambda team, year: {'pro_bowl_df': get_pro_bowls()},
+        'coaches': lambda team, year: {'team_coach_df': get_team_coaches(team)},
+        'seasons': lambda team, year: {'team_season_df': get_team_seasons(team)},
+        'games': lambda team, year: {'team_game_df': get_team_games(team, year)},
+        'roster': scrape_roster,
+        'player': lambda player_id, _: scrape_player_tables(player_id)
+    }
+    units = 0
+    while True:
+        unit = journal.claim(worker_id)
+        if unit is None:
+            if not journal.in_progress():
+                break
+            time.sleep(poll)  # other workers may still queue players
+            continue
+        team, year, stage = unit
+        journal.execute(team, year, stage, lambda: stages[stage](team, year))
+        units += 1
+    print(f'worker {worker_id} ran {units} units, requests: {get_fetcher().limiter.report()}')
+
+
+def filter_roster(roster_df: pd.DataFrame, player_game_df: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Keeps the roster candidates that pass scrape_team_roster's check: the player has no games for
+    the team that season, or played for them in week 1
+    '''
+    games = player_game_df[ROSTER_CHECK_COLS].copy()
+    games['week_num'] = pd.to_numeric(games.week_num)
+    first_weeks = games.groupby(['player', 'year', 'team'], observed=True).week_num.agg(['min', 'size'])
+    first_weeks = first_weeks.reindex(pd.MultiIndex.from_frame(roster_df[['player', 'year', 'team']]))
+    keep = first_weeks['size'].isna().to_numpy() | (first_weeks['min'] == 1).to_numpy()
+    return roster_df.loc[keep].reset_index(drop=True)
+
+
+def scrape_delta(year: int = None, csv_dir: str = 'csv') -> dict:
+    '''
+    In-season refresh of the stored FFData tables. Only pages that can hold new data are fetched:
+    the season's team gamelogs and rosters, plus the gamelogs and profile pages (seasons and
+    transactions) of known players whose games played on the season fantasy page is ahead of what
+    is stored. New rows are upserted on DELTA_KEYS, so rerunning a delta is idempotent.
+    '''
+    year = year or current_season()
+    tables = {name: read_table(name, csv_dir) for name in DELTA_TABLES}
+    print(f'executing scrape_delta({year})...')
+    # queue the team pages first, they are needed regardless of which players changed
+    team_game_futures = {
+        team: get_parse_pool().submit_fetched(
+            get_fetcher().submit(f'https://www.pro-football-reference.com/teams/{team}/{year}/gamelog'),
+            parse_team_games,
+            team,
+            year
+        )
+        for team in TEAMS
     }
+    get_fetcher().prefetch([f'https://www.pro-football-reference.com/teams/{team}/{year}_roster.htm' for team in TEAMS])
+    player_games = tables['player_games']
+    season_games = parse_fantasy_games(get_html(f'https://www.pro-football-reference.com/years/{year}/fantasy.htm', refresh=True))
+    stored_games = player_games.loc[(player_games.year == year) & player_games.active.fillna(False).astype(bool)].groupby('player').size()
+    known_players = set(tables['players'].id)
+    stale_players = [
+        player_id for player_id, games in season_games.items()
+        if player_id in known_players and games > stored_games.get(player_id, 0)
+    ]
+    print(f'refreshing {len(stale_players)} player gamelogs')
+    fetcher, pool = get_fetcher(), get_parse_pool()
+    player_game_futures = [
+        pool.submit_fetched(fetcher.submit(get_player_urls(player_id)[1], refresh=True), parse_player_games, player_id)
+        for player_id in stale_players
+    ]
+    player_page_futures = {
+        player_id: pool.submit_fetched(fetcher.submit(get_player_urls(player_id)[0], refresh=True), parse_player_page, player_id)
+        for player_id in stale_players
+    }
+    new_player_games = pd.DataFrame.from_records(
+        [record for future in player_game_futures for record in future.result() if record['year'] == year],
+        columns=PLAYER_GAME_COLS
+    )
+    tables['player_games'] = merge_rows(tables['player_games'], new_player_games, DELTA_KEYS['player_games'])
+    # trades, IR moves and the current season row of known players
+    player_pages = {
+        'players': [pd.DataFrame(columns=PLAYER_COLS)],
+        'player_seasons': [pd.DataFrame(columns=PLAYER_SEASON_COLS)],
+        'transactions': [pd.DataFrame(columns=TRANSACTION_COLS)]
+    }
+    for player_id, future in player_page_futures.items():
+        try:
+            for name, df in zip(player_pages, future.result()):
+                player_pages[name].append(df)
+        except Exception as e:
+            print(f'could not refresh player | player = {player_id} | {e!r}')
+    for name, dfs in player_pages.items():
+        tables[name] = merge_rows(tables[name], pd.concat(dfs, ignore_index=True), DELTA_KEYS[name])
+    team_games = [pd.DataFrame(columns=TEAM_GAME_COLS)]
+    for team, future in team_game_futures.items():
+        try:
+            team_games.append(pd.DataFrame.from_records(future.result()))
+        except Exception as e:
+            print(f'could not refresh team games | team = {team} | year = {year} | {e!r}')
+    tables['team_games'] = merge_rows(tables['team_games'], pd.concat(team_games, ignore_index=True), DELTA_KEYS['team_games'])
+    buffers = {
+        'players': TableBuffer(PLAYER_COLS, tables['players']),
+        'player_seasons': TableBuffer(PLAYER_SEASON_COLS, tables['player_seasons']),
+        'player_games': TableBuffer(PLAYER_GAME_COLS, tables['player_games']),
+        'transactions': TableBuffer(TRANSACTION_COLS, tables['transactions'])
+    }
+    registry = PlayerRegistry.from_frame(tables['players'], tables['player_games'])
+    roster_entries = TableBuffer(TEAM_ROSTER_COLS)
+    for team in TEAMS:
+        try:
+            roster_entries.append(scrape_team_roster(team, year, *buffers.values(), registry))
+        except Exception as e:
+            print(f'could not refresh roster | team = {team} | year = {year} | {e!r}')
+    tables.update({name: buffer.frame() for name, buffer in buffers.items()})
+    tables['rosters'] = merge_rows(tables['rosters'], roster_entries.frame(), DELTA_KEYS['rosters'])
+    for name, df in tables.items():
+        write_table(name, df, csv_dir)
+    return tables
+
+
+def merge_rows(df: pd.DataFrame, new_df: pd.DataFrame, keys: list) -> pd.DataFrame:
+    '''
+    Idempotent upsert, rows of new_df replace rows of df with the same key values
+    '''
+    # same dtypes on both sides, or e.g. stored datetime dates never match scraped text ones
+    merged = pd.concat([apply_schema(df), apply_schema(new_df)], ignore_index=True)
+    return apply_schema(merged.drop_duplicates(subset=keys, keep='last', ignore_index=True))
+
+
+def parse_fantasy_games(html: bytes) -> dict:
+    '''
+    Player id -> games played from a season fantasy page
+    '''
+    soup = make_soup(html, tables=['fantasy'])
+    season_games = {}
+    for row in soup.find_all('tr'):
+        cells = row_cells(row)
+        try:
+            player_id = cells['player'].a['href'].split('/')[3].split('.htm')[0]
+            season_games[player_id] = int(cells['g'].get_text())
+        except:
+            continue
+    return season_games
+
+
+def get_player_urls(player_id: str) -> tuple:
+    '''
+    Player profile and gamelog urls, the two pages scraped for every player
+    '''
+    return (
+        f'https://www.pro-football-reference.com/players/{player_id[0].upper()}/{player_id}.htm',
+        f'https://www.pro-football-reference.com/players/{player_id[0]}/{player_id}/gamelog'
+    )
 
 
+@traced
 def get_player_full(player_id: str, soup: BeautifulSoup = None) -> tuple:
     if soup is None:
         url = f'https://www.pro-football-reference.com/players/{player_id[0].upper()}/{player_id}.htm'
         soup = get_soup(url)
-    player_df = get_player_details(player_id, soup=soup)
+    comments = CommentIndex(soup)  # scan the page's hidden tables once for all three parsers
+    player_df = get_player_details(player_id, soup=soup, comments=comments)
     player_season_df = get_player_seasons(player_id, soup=soup)
-    player_transaction_df = get_transactions(player_id, soup=soup)
+    player_transaction_df = get_transactions(player_id, soup=soup, comments=comments)
     return player_df, player_season_df, player_transaction_df
 
 
-def get_player_details(player_id: str, soup: BeautifulSoup = None) -> pd.DataFrame:
+def parse_player_page(html: bytes, player_id: str) -> tuple:
+    '''
+    Parses a player profile page into the get_player_full frames, safe to run in a ParsePool worker
+    '''
+    return get_player_full(player_id, soup=BeautifulSoup(html, features="lxml"))
+
+
+@traced
+def get_player_details(player_id: str, soup: BeautifulSoup = None, comments: CommentIndex = None) -> pd.DataFrame:
     player_df = pd.DataFrame(columns=PLAYER_COLS)
     url = f'https://www.pro-football-reference.com/players/{player_id[0].upper()}/{player_id}.htm'
     if soup is None:
@@ -561,11 +1197,9 @@ def get_player_details(player_id: str, soup: BeautifulSoup = None) -> pd.DataFra
         pro_relatives = max(pro_relatives_str.count(';'), pro_relatives_str.count(',')) + 1
     except:
         pro_relatives = 0
-    combine_comment = soup.find(text=lambda text: isinstance(text, Comment) and 'div_combine' in text)
-    try:
-        combine_soup = BeautifulSoup(combine_comment, features='lxml')
-    except:
-        combine_soup = None
+    if comments is None:
+        comments = CommentIndex(soup)
+    combine_soup = comments.soup('div_combine')
     try:
         combine_table = combine_soup.find('table', attrs={'id': 'combine'}).find('tbody')
     except:
@@ -612,9 +1246,10 @@ def get_player_details(player_id: str, soup: BeautifulSoup = None) -> pd.DataFra
         [player_df, pd.DataFrame.from_dict(player_entry)],
         ignore_index=True
     )
-    return player_df
+    return apply_schema(player_df, TABLE_SCHEMAS['players'])
 
 
+@traced
 def get_player_seasons(player_id: str, soup: BeautifulSoup = None) -> pd.DataFrame:
     player_season_df = pd.DataFrame(columns=PLAYER_SEASON_COLS)
     if soup is None:
@@ -661,254 +1296,68 @@ def get_player_seasons(player_id: str, soup: BeautifulSoup = None) -> pd.DataFra
         [player_season_df, pd.DataFrame.from_records(player_season_entries)],
         ignore_index=True
     )
-    return player_season_df
+    return apply_schema(player_season_df, TABLE_SCHEMAS['player_seasons'])
 
 
-def get_player_games(player_id: str) -> pd.DataFrame:
+@traced
+def get_player_games(player_id: str, html: bytes = None) -> pd.DataFrame:
     player_game_df = pd.DataFrame(columns=PLAYER_GAME_COLS)
-    url = f'https://www.pro-football-reference.com/players/{player_id[0]}/{player_id}/gamelog'
-    soup = get_soup(url)
-    stat_table = soup.find('table', attrs={'id': 'stats'})
-    player_game_entries = []
-    if stat_table:
-        for row in stat_table.find_all('tr', attrs={'id': re.compile('stats.[0-9]')}):  # active games
-            active = True
-            dnp_reason = np.nan
-            try:
-                year = int(row.find('td', attrs={'data-stat': 'year_id'}).get_text())
-            except:
-                year = np.nan
-            try:
-                game_date = row.find('td', attrs={'data-stat': 'game_date'}).get_text()
-            except:
-                game_date = np.nan
-            try:
-                game_num = row.find('td', attrs={'data-stat': 'game_num'}).get_text()
-            except:
-                game_num = np.nan
-            try:
-                week_num = row.find('td', attrs={'data-stat': 'week_num'}).get_text()
-            except:
-                week_num = np.nan
-            try:
-                team = row.find('td', attrs={'data-stat': 'team'}).a['href'].split('/')[2].lower()
-            except:
-                team = np.nan
-            try:
-                opp = row.find('td', attrs={'data-stat': 'opp'}).a['href'].split('/')[2].lower()
-            except:
-                opp = np.nan
-            try:
-                game_location_cell = row.find('td', attrs={'data-stat': 'game_location'})
-                if game_location_cell.get_text() == '@':
-                    home = False
-                else:
-                    home = True
-            except:
-                home = np.nan
-            try:
-                game_start_cell = row.find('td', attrs={'data-stat': 'gs'})
-                if game_start_cell.get_text() == '*':
-                    start = True
-                else:
-                    start = False
-            except:
-                start = np.nan
-            try:
-                result_text = row.find('td', attrs={'data-stat': 'game_result'}).get_text()
-                win_loss = result_text.split()[0].upper()
-                score_text = result_text.split()[1]
-                team_score = int(score_text.split('-')[0])
-                opp_score = int(score_text.split('-')[1])
-            except:
-                win_loss = np.nan
-                score_text = np.nan
-                team_score = np.nan
-                opp_score = np.nan
-            try:
-                pass_comp = int(row.find('td', attrs={'data-stat': 'pass_cmp'}).get_text())
-            except:
-                pass_comp = 0
-            try:
-                pass_att = int(row.find('td', attrs={'data-stat': 'pass_att'}).get_text())
-            except:
-                pass_att = 0
-            try:
-                pass_yd = int(row.find('td', attrs={'data-stat': 'pass_yds'}).get_text())
-            except:
-                pass_yd = 0
-            try:
-                pass_td = int(row.find('td', attrs={'data-stat': 'pass_td'}).get_text())
-            except:
-                pass_td = 0
-            try:
-                pass_int = int(row.find('td', attrs={'data-stat': 'pass_int'}).get_text())
-            except:
-                pass_int = 0
-            try:
-                qb_rate = float(row.find('td', attrs={'data-stat': 'pass_rating'}).get_text())
-            except:
-                qb_rate = 0.
-            try:
-                rush_att = int(row.find('td', attrs={'data-stat': 'rush_att'}).get_text())
-            except:
-                rush_att = 0
-            try:
-                rush_yd = int(row.find('td', attrs={'data-stat': 'rush_yds'}).get_text())
-            except:
-                rush_yd = 0
-            try:
-                rush_td = int(row.find('td', attrs={'data-stat': 'rush_td'}).get_text())
-            except:
-                rush_td = 0
-            try:
-                rec = int(row.find('td', attrs={'data-stat': 'rec'}).get_text())
-            except:
-                rec = 0
-            try:
-                rec_tgt = int(row.find('td', attrs={'data-stat': 'targets'}).get_text())
-            except:
-                rec_tgt = 0
-            try:
-                rec_yd = int(row.find('td', attrs={'data-stat': 'rec_yds'}).get_text())
-            except:
-                rec_yd = 0
-            try:
-                rec_td = int(row.find('td', attrs={'data-stat': 'rec_td'}).get_text())
-            except:
-                rec_td = 0
-            player_game_entries.append({
-                'player': player_id,
-                'year': year,
-                'date': game_date,
-                'game_num': game_num,
-                'week_num': week_num,
-                'team': team,
-                'opp': opp,
-                'home': home,
-                'result': win_loss,
-                'team_score': team_score,
-                'opp_score': opp_score,
-                'active': active,
-                'start': start,
-                'dnp_reason': dnp_reason,
-                'pass_comp': pass_comp,
-                'pass_att': pass_att,
-                'pass_yd': pass_yd,
-                'pass_td': pass_td,
-                'pass_int': pass_int,
-                'qb_rate': qb_rate,
-                'rush_att': rush_att,
-                'rush_yd': rush_yd,
-                'rush_td': rush_td,
-                'rec': rec,
-                'rec_tgt': rec_tgt,
-                'rec_yd': rec_yd,
-                'rec_td': rec_td
-            })
-        for row in stat_table.find_all('tr', attrs={'class': 'gamelog_dnp'}):  # inactive games
-            active = False
-            try:
-                year = int(row.find('td', attrs={'data-stat': 'year_id'}).get_text())
-            except:
-                year = np.nan
-            try:
-                game_date = row.find('td', attrs={'data-stat': 'game_date'}).get_text()
-            except:
-                game_date = np.nan
-            try:
-                game_num = row.find('td', attrs={'data-stat': 'game_num'}).get_text()
-            except:
-                game_num = np.nan
-            try:
-                week_num = row.find('td', attrs={'data-stat': 'week_num'}).get_text()
-            except:
-                week_num = np.nan
-            try:
-                team = row.find('td', attrs={'data-stat': 'team'}).a['href'].split('/')[2].lower()
-            except:
-                team = np.nan
-            try:
-                opp = row.find('td', attrs={'data-stat': 'opp'}).a['href'].split('/')[2].lower()
-            except:
-                opp = np.nan
-            try:
-                game_location_cell = row.find('td', attrs={'data-stat': 'game_location'})
-                if game_location_cell.get_text() == '@':
-                    home = False
-                else:
-                    home = True
-            except:
-                home = np.nan
-            try:
-                game_start_cell = row.find('td', attrs={'data-stat': 'gs'})
-                if game_start_cell.get_text() == '*':
-                    start = True
-                else:
-                    start = False
-            except:
-                start = np.nan
-            try:
-                result_text = row.find('td', attrs={'data-stat': 'game_result'}).get_text()
-                win_loss = result_text.split()[0].upper()
-                score_text = result_text.split()[1]
-                team_score = int(score_text.split('-')[0])
-                opp_score = int(score_text.split('-')[1])
-            except:
-                win_loss = np.nan
-                score_text = np.nan
-                team_score = np.nan
-                opp_score = np.nan
-            try:
-                dnp_reason = row.find('td', attrs={'data-stat': 'reason'}).get_text().lower()
-                dnp_reason = '_'.join(dnp_reason.split())
-            except:
-                dnp_reason = np.nan
-            player_game_entries.append({
-                'player': player_id,
-                'year': year,
-                'date': game_date,
-                'game_num': game_num,
-                'week_num': week_num,
-                'team': team,
-                'opp': opp,
-                'home': home,
-                'result': win_loss,
-                'team_score': team_score,
-                'opp_score': opp_score,
-                'active': active,
-                'start': start,
-                'dnp_reason': dnp_reason,
-                'pass_comp': 0,
-                'pass_att': 0,
-                'pass_yd': 0,
-                'pass_td': 0,
-                'pass_int': 0,
-                'qb_rate': 0.,
-                'rush_att': 0,
-                'rush_yd': 0,
-                'rush_td': 0,
-                'rec': 0,
-                'rec_tgt': 0,
-                'rec_yd': 0,
-                'rec_td': 0
-            })
+    if html is None:
+        html = get_html(get_player_urls(player_id)[1])
     player_game_df = pd.concat(
-        [player_game_df, pd.DataFrame.from_records(player_game_entries)],
+        [player_game_df, pd.DataFrame.from_records(parse_player_games(html, player_id))],
         ignore_index=True
     )
-    return player_game_df
+    return apply_schema(player_game_df, TABLE_SCHEMAS['player_games'])
+
+
+def parse_player_games(html: bytes, player_id: str) -> list:
+    '''
+    Parses a player gamelog page into game records, safe to run in a ParsePool worker
+    '''
+    soup = make_soup(html, tables=['stats'])
+    stat_table = soup.find('table', attrs={'id': 'stats'})
+    active_entries = []
+    inactive_entries = []
+    if stat_table:
+        for row in stat_table.find_all('tr'):
+            row_id = row.get('id')
+            active = row_id is not None and PLAYER_GAME_ROW_ID.search(row_id) is not None
+            inactive = 'gamelog_dnp' in (row.get('class') or [])
+            if not active and not inactive:
+                continue
+            cells = row_cells(row)
+            entry = extract_row(cells, PLAYER_GAME_SPEC)
+            entry['result'], entry['team_score'], entry['opp_score'] = GAME_RESULT_COL.extract(cells)
+            entry['player'] = player_id
+            if active:
+                active_entries.append({
+                    **{col: entry.get(col) for col in PLAYER_GAME_COLS},
+                    'active': True,
+                    'dnp_reason': np.nan
+                })
+            if inactive:
+                inactive_entries.append({
+                    **{col: entry.get(col) for col in PLAYER_GAME_COLS},
+                    **{col: PLAYER_GAME_SPEC[col].default for col in PLAYER_GAME_STAT_COLS},
+                    'active': False,
+                    'dnp_reason': DNP_REASON_COL.extract(cells)
+                })
+    return active_entries + inactive_entries
 
 
-def get_transactions(player_id: str, soup: BeautifulSoup = None) -> pd.DataFrame:
+@traced
+def get_transactions(player_id: str, soup: BeautifulSoup = None, comments: CommentIndex = None) -> pd.DataFrame:
     transaction_df = pd.DataFrame(columns=TRANSACTION_COLS)
     transaction_entries = []
     url = f'https://www.pro-football-reference.com/players/{player_id[0]}/{player_id}.htm'
     if soup is None:
         soup = get_soup(url)
-    transaction_comment = soup.find(text=lambda text: isinstance(text, Comment) and 'div_transactions' in text and 'news_stories' in text)
-    if transaction_comment:
-        transaction_soup = BeautifulSoup(transaction_comment, features='lxml')
+    if comments is None:
+        comments = CommentIndex(soup)
+    transaction_comment = comments.comment('div_transactions')
+    if transaction_comment and 'news_stories' in transaction_comment:
+        transaction_soup = comments.soup('div_transactions')
         for entry in transaction_soup.find_all('li'):
             entry_id = entry.get('id')
             if entry_id is not None and entry_id == 'transactions_toggler':
@@ -930,18 +1379,15 @@ def get_transactions(player_id: str, soup: BeautifulSoup = None) -> pd.DataFrame
         [transaction_df, pd.DataFrame.from_records(transaction_entries)],
         ignore_index=True
     )
-    return transaction_df
+    return apply_schema(transaction_df, TABLE_SCHEMAS['transactions'])
 
 
+@traced
 def get_team_seasons(team: str, start_year: int = 1995, end_year: int = 2022) -> pd.DataFrame:
     team_season_df = pd.DataFrame(columns=TEAM_SEASON_COLS)
     team_season_entries = []
-    for year in range(start_year, end_year + 1):
-        url = f'https://www.pro-football-reference.com/teams/{team}/{year}.htm'
-        try:
-            soup = get_soup(url)
-        except:
-            continue
+    urls = {year: f'https://www.pro-football-reference.com/teams/{team}/{year}.htm' for year in range(start_year, end_year + 1)}
+    for year, soup in get_soups(urls, skip_errors=True):
         try:
             record_str = re.search(r'[0-9]{1,2}-[0-9]{1,2}-[0-9]{1,2}', soup.find('strong', string='Record:').find_parent('p').get_text()).group()
             record_str_split = record_str.split('-')
@@ -974,170 +1420,55 @@ def get_team_seasons(team: str, start_year: int = 1995, end_year: int = 2022) ->
         [team_season_df, pd.DataFrame.from_records(team_season_entries)],
         ignore_index=True
     )
-    return team_season_df
+    return apply_schema(team_season_df, TABLE_SCHEMAS['team_seasons'])
 
 
-def get_team_games(team: str, year: int) -> pd.DataFrame:
+@traced
+def get_team_games(team: str, year: int, html: bytes = None) -> pd.DataFrame:
     team_game_df = pd.DataFrame(columns=TEAM_GAME_COLS)
-    url = f'https://www.pro-football-reference.com/teams/{team}/{year}/gamelog'
-    soup = get_soup(url)
+    if html is None:
+        html = get_html(f'https://www.pro-football-reference.com/teams/{team}/{year}/gamelog')
+    team_game_df = pd.concat(
+        [team_game_df, pd.DataFrame.from_records(parse_team_games(html, team, year))],
+        ignore_index=True
+    )
+    return apply_schema(team_game_df, TABLE_SCHEMAS['team_games'])
+
+
+def parse_team_games(html: bytes, team: str, year: int) -> list:
+    '''
+    Parses a team gamelog page into game records, safe to run in a ParsePool worker
+    '''
+    soup = make_soup(html, tables=[f'gamelog{year}', f'gamelog_opp{year}'])
     opp_gamelog_table = soup.find('table', attrs={'id': re.compile('^gamelog_opp[0-9]{4}')})
     opp_top_data = {}
     for row in opp_gamelog_table.find_all('tr', attrs={'id': re.compile('^gamelog_opp[0-9]{4}.[0-9]')}):
-        try:
-            opp_game_date = row.find('td', attrs={'data-stat': 'game_date'})['csk']
-        except:
-            continue
-        try:
-            opp_top_str = row.find('td', attrs={'data-stat': 'time_of_poss'}).get_text().split(':')
-            opp_mins = int(opp_top_str[0])
-            opp_secs = int(opp_top_str[1])
-            opp_top_data[opp_game_date] = opp_mins * 60 + opp_secs
-        except:
-            continue
+        cells = row_cells(row)
+        opp_game_date = TEAM_GAME_SPEC['date'].extract(cells)
+        opp_top = TEAM_GAME_SPEC['team_top'].extract(cells)
+        if isinstance(opp_game_date, str) and not pd.isna(opp_top):
+            opp_top_data[opp_game_date] = opp_top
     gamelog_table = soup.find('table', attrs={'id': re.compile('^gamelog[0-9]{4}')})
     team_game_entries = []
     game_num = 0
     for row in gamelog_table.find_all('tr', attrs={'id': re.compile('^gamelog[0-9]{4}.[0-9]')}):
         game_num += 1
-        try:
-            game_date = row.find('td', attrs={'data-stat': 'game_date'})['csk']
-        except:
-            game_date = np.nan
-        try:
-            week_num = int(row.find('th', attrs={'data-stat': 'week_num'}).get_text())
-        except:
-            week_num = np.nan
-        try:
-            opp = row.find('td', attrs={'data-stat': 'opp'}).a['href'].split('/')[2].lower()
-        except:
-            opp = np.nan
-        try:
-            game_location_cell = row.find('td', attrs={'data-stat': 'game_location'})
-            if game_location_cell.get_text() == '@':
-                home = False
-            else:
-                home = True
-        except:
-            home = np.nan
-        try:
-            result = row.find('td', attrs={'data-stat': 'game_outcome'}).get_text().upper()
-        except:
-            result = np.nan
-        try:
-            team_score = int(row.find('td', attrs={'data-stat': 'pts_off'}).get_text())
-        except:
-            team_score = np.nan
-        try:
-            opp_score = int(row.find('td', attrs={'data-stat': 'pts_def'}).get_text())
-        except:
-            opp_score = np.nan
-        try:
-            pass_comp = int(row.find('td', attrs={'data-stat': 'pass_cmp'}).get_text())
-        except:
-            pass_comp = 0
-        try:
-            pass_att = int(row.find('td', attrs={'data-stat': 'pass_att'}).get_text())
-        except:
-            pass_att = 0
-        try:
-            pass_yd = int(row.find('td', attrs={'data-stat': 'pass_yds'}).get_text())
-        except:
-            pass_yd = 0
-        try:
-            pass_td = int(row.find('td', attrs={'data-stat': 'pass_td'}).get_text())
-        except:
-            pass_td = 0
-        try:
-            pass_int = int(row.find('td', attrs={'data-stat': 'pass_int'}).get_text())
-        except:
-            pass_int = 0
-        try:
-            qb_rate = float(row.find('td', attrs={'data-stat': 'pass_rating'}).get_text())
-        except:
-            qb_rate = 0.
-        try:
-            sack = int(row.find('td', attrs={'data-stat': 'pass_sacked'}).get_text())
-        except:
-            sack = 0
-        try:
-            rush_att = int(row.find('td', attrs={'data-stat': 'rush_att'}).get_text())
-        except:
-            rush_att = 0
-        try:
-            rush_yd = int(row.find('td', attrs={'data-stat': 'rush_yds'}).get_text())
-        except:
-            rush_yd = 0
-        try:
-            rush_td = int(row.find('td', attrs={'data-stat': 'rush_td'}).get_text())
-        except:
-            rush_td = 0
-        try:
-            third_down_att = int(row.find('td', attrs={'data-stat': 'third_down_att'}).get_text())
-        except:
-            third_down_att = np.nan
-        try:
-            third_down_conv = int(row.find('td', attrs={'data-stat': 'third_down_success'}).get_text())
-        except:
-            third_down_conv = np.nan
-        try:
-            fourth_down_att = int(row.find('td', attrs={'data-stat': 'fourth_down_att'}).get_text())
-        except:
-            fourth_down_att = np.nan
-        try:
-            fourth_down_conv = int(row.find('td', attrs={'data-stat': 'fourth_down_success'}).get_text())
-        except:
-            fourth_down_conv = np.nan
-        try:
-            team_top_str = row.find('td', attrs={'data-stat': 'time_of_poss'}).get_text().split(':')
-            mins = int(team_top_str[0])
-            secs = int(team_top_str[1])
-            team_top = mins * 60 + secs
-        except:
-            team_top = np.nan
-        try:
-            opp_top = opp_top_data[game_date]
-        except:
-            opp_top = np.nan
-        team_game_entries.append({
+        entry = extract_row(row_cells(row), TEAM_GAME_SPEC)
+        entry.update({
             'team': team,
             'year': year,
-            'date': game_date,
             'game_num': game_num,
-            'week_num': week_num,
-            'opp': opp,
-            'home': home,
-            'result': result,
-            'team_score': team_score,
-            'opp_score': opp_score,
-            'pass_comp': pass_comp,
-            'pass_att': pass_att,
-            'pass_yd': pass_yd,
-            'pass_td': pass_td,
-            'pass_int': pass_int,
-            'qb_rate': qb_rate,
-            'sack': sack,
-            'rush_att': rush_att,
-            'rush_yd': rush_yd,
-            'rush_td': rush_td,
-            'team_top': team_top,
-            'opp_top': opp_top,
-            'fourth_down_att': fourth_down_att,
-            'fourth_down_conv': fourth_down_conv,
-            'third_down_att': third_down_att,
-            'third_down_conv': third_down_conv
+            'opp_top': opp_top_data.get(entry['date'], np.nan)
         })
-    team_game_df = pd.concat(
-        [team_game_df, pd.DataFrame.from_records(team_game_entries)],
-        ignore_index=True
-    )
-    return team_game_df
+        team_game_entries.append({col: entry[col] for col in TEAM_GAME_COLS})
+    return team_game_entries
 
 
+@traced
 def get_team_coaches(team, start_year: int = 1982) -> pd.DataFrame:
     team_coach_df = pd.DataFrame(columns=TEAM_COACH_COLS)
     url = f'https://www.pro-football-reference.com/teams/{team}/coaches.htm'
-    soup = get_soup(url)
+    soup = get_soup(url, tables=['coaches_year'])
     coach_table = soup.find('table', attrs={'id': 'coaches_year'}).find('tbody')
     team_coach_entries = []
     for row in coach_table.find_all('tr'):
@@ -1198,26 +1529,142 @@ def get_team_coaches(team, start_year: int = 1982) -> pd.DataFrame:
         [team_coach_df, pd.DataFrame.from_records(team_coach_entries)],
         ignore_index=True
     )
-    return team_coach_df
+    return apply_schema(team_coach_df, TABLE_SCHEMAS['team_coaches'])
 
 
+@traced
 def get_team_roster(team: str,
                     year: int,
                     player_df: pd.DataFrame = None,
                     player_game_df: pd.DataFrame = None,
                     player_season_df: pd.DataFrame = None,
                     transaction_df: pd.DataFrame = None) -> tuple:
-    if player_df is None:
-        player_df = pd.DataFrame(columns=PLAYER_COLS)
-    if player_game_df is None:
-        player_game_df = pd.DataFrame(columns=PLAYER_GAME_COLS)
-    if player_season_df is None:
-        player_season_df = pd.DataFrame(columns=PLAYER_SEASON_COLS)
-    if transaction_df is None:
-        transaction_df = pd.DataFrame(columns=TRANSACTION_COLS)
+    players = TableBuffer(PLAYER_COLS, player_df)
+    player_seasons = TableBuffer(PLAYER_SEASON_COLS, player_season_df)
+    player_games = TableBuffer(PLAYER_GAME_COLS, player_game_df)
+    transactions = TableBuffer(TRANSACTION_COLS, transaction_df)
+    registry = PlayerRegistry.from_frame(players.frame(), player_games.frame())
+    team_roster_df = scrape_team_roster(team, year, players, player_seasons, player_games, transactions, registry)
+    return (
+        apply_schema(team_roster_df, TABLE_SCHEMAS['rosters']),
+        apply_schema(players.frame(), TABLE_SCHEMAS['players']),
+        apply_schema(player_seasons.frame(), TABLE_SCHEMAS['player_seasons']),
+        apply_schema(player_games.frame(), TABLE_SCHEMAS['player_games']),
+        apply_schema(transactions.frame(), TABLE_SCHEMAS['transactions'])
+    )
+
+
+@traced
+def scrape_team_roster(team: str,
+                       year: int,
+                       players: TableBuffer,
+                       player_seasons: TableBuffer,
+                       player_games: TableBuffer,
+                       transactions: TableBuffer,
+                       registry: PlayerRegistry) -> pd.DataFrame:
+    '''
+    Scrapes a team roster, appending every offensive player not already in the registry to the
+    buffers and registering their game rows
+    '''
     team_roster_df = pd.DataFrame(columns=TEAM_ROSTER_COLS)
     url = f'https://www.pro-football-reference.com/teams/{team}/{year}_roster.htm'
-    soup = get_soup(url)
+    starters, roster_players = parse_team_roster(get_html(url), team, year)
+    # queue every new player's pages up front, so they download and parse in the background
+    # while earlier players are being processed
+    player_futures = {}
+    for player_id, _ in roster_players:
+        if player_id in player_futures or player_id in registry:
+            continue
+        player_url, player_gamelog_url = get_player_urls(player_id)
+        player_futures[player_id] = (
+            get_parse_pool().submit_fetched(get_fetcher().submit(player_url), parse_player_page, player_id),
+            get_parse_pool().submit_fetched(get_fetcher().submit(player_gamelog_url), parse_player_games, player_id)
+        )
+    roster_entries = []
+    for player_id, position in roster_players:
+        if player_id not in registry:  # scrape all player data
+            player_future, player_game_future = player_futures[player_id]
+            (player, player_season_entries, player_transactions) = player_future.result()
+            player_game_entries = pd.concat(
+                [pd.DataFrame(columns=PLAYER_GAME_COLS), pd.DataFrame.from_records(player_game_future.result())],
+                ignore_index=True
+            )
+            players.append(player)
+            player_seasons.append(player_season_entries)
+            transactions.append(player_transactions)
+            start = len(player_games)
+            player_games.append(player_game_entries)
+            registry.add(player_id, start, len(player_games))
+        else:
+            print(f'already scraped {player_id}, skipping...')
+            player_game_entries = player_games.take(registry.rows(player_id))
+        player_roster_games = player_game_entries.loc[(player_game_entries.year == year) & (player_game_entries.team == team)]
+        # week_num is text when freshly scraped but numeric when loaded from csv
+        if pd.to_numeric(player_roster_games.week_num).min() == 1 or player_roster_games.empty:  # include this player on the team roster
+            if starters:
+                is_starter = True if player_id in starters else False
+            else:
+                is_starter = np.nan
+            roster_entries.append({
+                'team': team,
+                'year': year,
+                'player': player_id,
+                'position': position,
+                'is_starter': is_starter
+            })
+    team_roster_df = pd.concat(
+        [team_roster_df, pd.DataFrame.from_records(roster_entries)],
+        ignore_index=True
+    )
+    return team_roster_df
+
+
+@traced
+def scrape_roster_candidates(team: str, year: int) -> pd.DataFrame:
+    '''
+    Every offensive player on a team roster, before the week 1 check scrape_team_roster applies
+    '''
+    url = f'https://www.pro-football-reference.com/teams/{team}/{year}_roster.htm'
+    starters, roster_players = parse_team_roster(get_html(url), team, year)
+    roster_entries = []
+    for player_id, position in roster_players:
+        roster_entries.append({
+            'team': team,
+            'year': year,
+            'player': player_id,
+            'position': position,
+            'is_starter': (player_id in starters) if starters else np.nan
+        })
+    return pd.concat([pd.DataFrame(columns=TEAM_ROSTER_COLS), pd.DataFrame.from_records(roster_entries)], ignore_index=True)
+
+
+@traced
+def scrape_player_tables(player_id: str) -> dict:
+    '''
+    A player's profile and gamelog tables, the pages are fetched concurrently
+    '''
+    player_url, player_gamelog_url = get_player_urls(player_id)
+    player_future = get_fetcher().submit(player_url)
+    player_game_future = get_fetcher().submit(player_gamelog_url)
+    player, player_season_entries, player_transactions = parse_player_page(player_future.result(), player_id)
+    player_game_entries = pd.concat(
+        [pd.DataFrame(columns=PLAYER_GAME_COLS), pd.DataFrame.from_records(parse_player_games(player_game_future.result(), player_id))],
+        ignore_index=True
+    )
+    return {
+        'player_df': player,
+        'player_season_df': player_season_entries,
+        'player_game_df': player_game_entries,
+        'transaction_df': player_transactions
+    }
+
+
+def parse_team_roster(html: bytes, team: str, year: int) -> tuple:
+    '''
+    Parses a team roster page into (starter ids, [(player id, position)] for offensive players),
+    safe to run in a ParsePool worker
+    '''
+    soup = make_soup(html, tables=['starters', 'roster'])
     starters = []
     starter_table = soup.find('table', attrs={'id': 'starters'})
     if starter_table:
@@ -1226,12 +1673,11 @@ def get_team_roster(team: str,
                 starters.append(row.find('td', attrs={'data-stat': 'player'})['data-append-csv'])
             except:
                 continue
-    comment = soup.find(text=lambda text: isinstance(text, Comment) and 'div_roster' in text)
-    if not comment:
+    roster_table = soup.find('table', attrs={'id': 'roster'})  # shipped inside an html comment
+    if not roster_table:
         raise ValueError(f'could not scrape team roster | team = {team} | year = {year}')
-    comment_soup = BeautifulSoup(comment, features='lxml')
-    roster_table = comment_soup.find('table', attrs={'id': 'roster'}).find('tbody')
-    roster_entries = []
+    roster_table = roster_table.find('tbody')
+    roster_players = []
     for row in roster_table.find_all('tr'):
         try:
             player_id = row.find('td', attrs={'data-stat': 'player'}).a['href'].split('/')[-1].split('.htm')[0]
@@ -1244,510 +1690,386 @@ def get_team_roster(team: str,
         except:
             continue
         if position in OFFENSIVE_POSITIONS:
-            player = player_df.loc[player_df.id == player_id]
-            if player.empty:  # scrape all player data
-                (player, player_seasons, player_transactions) = get_player_full(player_id)
-                player_games = get_player_games(player_id)
-                player_df = pd.concat(
-                    [player_df, player],
-                    ignore_index=True
-                )
-                player_season_df = pd.concat(
-                    [player_season_df, player_seasons],
-                    ignore_index=True
-                )
-                transaction_df = pd.concat(
-                    [transaction_df, player_transactions],
-                    ignore_index=True
-                )
-                player_game_df = pd.concat(
-                    [player_game_df, player_games],
-                    ignore_index=True
-                )
-            else:
-                print(f'already scraped {player_id}, skipping...')
-                player_games = player_game_df.loc[player_game_df.player == player_id]
-            player_roster_games = player_games.loc[(player_games.year == year) & (player_games.team == team)]
-            if player_roster_games.week_num.min() == '1' or player_roster_games.empty:  # include this player on the team roster
-                if starters:
-                    is_starter = True if player_id in starters else False
-                else:
-                    is_starter = np.nan
-                roster_entries.append({
-                    'team': team,
-                    'year': year,
-                    'player': player_id,
-                    'position': position,
-                    'is_starter': is_starter
-                })
-    team_roster_df = pd.concat(
-        [team_roster_df, pd.DataFrame.from_records(roster_entries)],
-        ignore_index=True
-    )
-    return team_roster_df, player_df, player_season_df, player_game_df, transaction_df
+            roster_players.append((player_id, position))
+    return starters, roster_players
+
+
+@traced
+def get_draft_picks(start_year: int = 1982,
+                    end_year: int = 2022,
+                    ref_dir: str = REFERENCE_DIR,
+                    refresh: bool = False) -> pd.DataFrame:
+    return load_reference_table('draft_picks', start_year, end_year, ref_dir, refresh)
 
 
-def get_draft_picks(start_year: int = 1982, end_year: int = 2022) -> pd.DataFrame:
-    draft_pick_df = pd.DataFrame(columns=DRAFT_PICK_COLS)
+def parse_draft_picks(html: bytes, year: int) -> list:
+    '''
+    Parses a season draft page into DRAFT_PICK_COLS records, safe to run in a ParsePool worker
+    '''
+    soup = make_soup(html, tables=['drafts'])
+    draft_table = soup.find('table', attrs={'id': 'drafts'}).find('tbody')
     draft_pick_entries = []
-    for year in range(start_year, end_year + 1):
-        url = f'https://www.pro-football-reference.com/years/{year}/draft.htm'
-        soup = get_soup(url)
-        draft_table = soup.find('table', attrs={'id': 'drafts'}).find('tbody')
-        for row in draft_table.find_all('tr'):
-            row_class = row.get('class')
-            if row_class and 'thead' in row_class:
-                # print('skipping header row...')
-                continue
-            player_cell = row.find('td', attrs={'data-stat': 'player'})
-            if not player_cell:
-                continue
-            player_link = player_cell.find('a')
-            if player_link:
-                try:
-                    player = player_link['href'].split('/')[-1].split('.htm')[0]
-                except:
-                    raise ValueError('could not parse player URL')
-            else:
-                player = player_cell.get_text().replace(' ', '')
-            try:
-                rnd = int(row.find('th', attrs={'data-stat': 'draft_round'}).get_text())
-            except:
-                rnd = np.nan
-            try:
-                pick = int(row.find('td', attrs={'data-stat': 'draft_pick'}).get_text())
-            except:
-                pick = np.nan
-            try:
-                age = int(row.find('td', attrs={'data-stat': 'age'}).get_text())
-            except:
-                age = np.nan
-            try:
-                team = row.find('td', attrs={'data-stat': 'team'}).a['href'].split('/')[2].lower()
-            except:
-                team = np.nan
+    for row in draft_table.find_all('tr'):
+        row_class = row.get('class')
+        if row_class and 'thead' in row_class:
+            continue
+        cells = row_cells(row)
+        player_cell = cells.get('player')
+        if not player_cell:
+            continue
+        player_link = player_cell.find('a')
+        if player_link:
             try:
-                position = row.find('td', attrs={'data-stat': 'pos'}).get_text().upper()
-                if position in OL_POSITIONS:
-                    position = 'OL'
+                player = player_link['href'].split('/')[-1].split('.htm')[0]
             except:
-                position = np.nan
-            draft_pick_entries.append({
-                'year': year,
-                'round': rnd,
-                'pick': pick,
-                'player': player,
-                'team': team,
-                'age': age,
-                'position': position
-            })
-    draft_pick_df = pd.concat(
-        [draft_pick_df, pd.DataFrame.from_records(draft_pick_entries)],
-        ignore_index=True
-    )
-    return draft_pick_df
+                raise ValueError('could not parse player URL')
+        else:
+            player = player_cell.get_text().replace(' ', '')
+        draft_pick_entries.append({
+            'year': year,
+            'player': player,
+            **extract_row(cells, DRAFT_PICK_SPEC)
+        })
+    return draft_pick_entries
 
 
-def get_awards(start_year: int = 1982, end_year: int = 2022) -> pd.DataFrame:
-    award_df = pd.DataFrame(columns=AWARD_COLS)
-    award_entries = []
-    for year in range(start_year, end_year + 1):
-        url = f'https://www.pro-football-reference.com/awards/awards_{year}.htm'
-        soup = get_soup(url)
+@traced
+def get_awards(start_year: int = 1982,
+               end_year: int = 2022,
+               ref_dir: str = REFERENCE_DIR,
+               refresh: bool = False) -> pd.DataFrame:
+    return load_reference_table('awards', start_year, end_year, ref_dir, refresh)
 
-        # MVP
-        mvp_table = soup.find('table', attrs={'id': 'voting_apmvp'}).find('tbody')
-        for row in mvp_table.find_all('tr'):
-            award_type = 'mvp'
-            row_class = row.get('class')
-            if row_class and 'bold' in row_class:
-                win = True
-            else:
-                win = False
-            try:
-                player = row.find('td', attrs={'data-stat': 'player'}).a['href'].split('/')[-1].split('.htm')[0]
-            except:
-                continue
-            try:
-                vote_share = float(row.find('td', attrs={'data-stat': 'share'}).get_text()[:-1]) / 100.
-            except:
-                vote_share = np.nan
-            award_entries.append({
-                'year': year,
-                'player': player,
-                'award_type': award_type,
-                'win': win,
-                'vote_share': vote_share
-            })
 
-        # OPOY
-        opoy_table = soup.find('table', attrs={'id': 'voting_apopoy'}).find('tbody')
-        for row in opoy_table.find_all('tr'):
-            award_type = 'opoy'
-            row_class = row.get('class')
-            if row_class and 'bold' in row_class:
-                win = True
-            else:
-                win = False
-            try:
-                player = row.find('td', attrs={'data-stat': 'player'}).a['href'].split('/')[-1].split('.htm')[0]
-            except:
-                continue
-            try:
-                vote_share = float(row.find('td', attrs={'data-stat': 'share'}).get_text()[:-1]) / 100.
-            except:
-                vote_share = np.nan
-            award_entries.append({
-                'year': year,
-                'player': player,
-                'award_type': award_type,
-                'win': win,
-                'vote_share': vote_share
-            })
+# award type -> voting table on a season awards page, there is no cpoy vote before 2016
+AWARD_TABLES = {
+    'mvp': 'voting_apmvp',
+    'opoy': 'voting_apopoy',
+    'oroy': 'voting_aporoy',
+    'cpoy': 'voting_apcpoy'
+}
 
-        # OROY
-        oroy_table = soup.find('table', attrs={'id': 'voting_aporoy'}).find('tbody')
-        for row in oroy_table.find_all('tr'):
-            award_type = 'oroy'
-            row_class = row.get('class')
-            if row_class and 'bold' in row_class:
-                win = True
-            else:
-                win = False
-            try:
-                player = row.find('td', attrs={'data-stat': 'player'}).a['href'].split('/')[-1].split('.htm')[0]
-            except:
+OPTIONAL_AWARDS = ['cpoy']
+
+# cells backing AWARD_COLS; year, award_type and win are set by the parser
+AWARD_SPEC = {
+    'player': Col('player', lambda segment: segment.split('.htm')[0], href=-1),
+    'vote_share': Col('share', lambda text: float(text[:-1]) / 100.)
+}
+
+
+def parse_awards(html: bytes, year: int) -> list:
+    '''
+    Parses a season awards page into AWARD_COLS records, safe to run in a ParsePool worker
+    '''
+    soup = make_soup(html, tables=list(AWARD_TABLES.values()))
+    award_entries = []
+    for award_type, table_id in AWARD_TABLES.items():
+        award_table = soup.find('table', attrs={'id': table_id})
+        if award_table is None:
+            if award_type in OPTIONAL_AWARDS:
+                continue
+            raise ValueError(f'could not find {award_type} voting | year = {year}')
+        for row in award_table.find('tbody').find_all('tr'):
+            entry = extract_row(row_cells(row), AWARD_SPEC)
+            if not isinstance(entry['player'], str):
                 continue
-            try:
-                vote_share = float(row.find('td', attrs={'data-stat': 'share'}).get_text()[:-1]) / 100.
-            except:
-                vote_share = np.nan
             award_entries.append({
                 'year': year,
-                'player': player,
                 'award_type': award_type,
-                'win': win,
-                'vote_share': vote_share
+                'win': 'bold' in (row.get('class') or []),
+                **entry
             })
+    return award_entries
 
-        # CPOY
-        try:
-            cpoy_table = soup.find('table', attrs={'id': 'voting_apcpoy'}).find('tbody')
-        except:
-            cpoy_table = None
-        if cpoy_table:
-            for row in cpoy_table.find_all('tr'):
-                award_type = 'cpoy'
-                row_class = row.get('class')
-                if row_class and 'bold' in row_class:
-                    win = True
-                else:
-                    win = False
-                try:
-                    player = row.find('td', attrs={'data-stat': 'player'}).a['href'].split('/')[-1].split('.htm')[0]
-                except:
-                    continue
+
+@traced
+def get_all_pros(start_year: int = 1982,
+                 end_year: int = 2022,
+                 ref_dir: str = REFERENCE_DIR,
+                 refresh: bool = False) -> pd.DataFrame:
+    return load_reference_table('all_pros', start_year, end_year, ref_dir, refresh)
+
+
+def parse_all_pros(html: bytes, year: int) -> list:
+    '''
+    Parses a season All-Pro page into ALL_PRO_COLS records, safe to run in a ParsePool worker
+    '''
+    return parse_player_list(html, 'all_pro', year)
+
+
+@traced
+def get_pro_bowls(start_year: int = 1982,
+                  end_year: int = 2022,
+                  ref_dir: str = REFERENCE_DIR,
+                  refresh: bool = False) -> pd.DataFrame:
+    return load_reference_table('pro_bowls', start_year, end_year, ref_dir, refresh)
+
+
+def parse_pro_bowls(html: bytes, year: int) -> list:
+    '''
+    Parses a season Pro Bowl page into PRO_BOWL_COLS records, safe to run in a ParsePool worker
+    '''
+    return parse_player_list(html, 'pro_bowl', year)
+
+
+def parse_player_list(html: bytes, table_id: str, year: int) -> list:
+    '''
+    (year, player) records for every player row of a season honors table
+    '''
+    soup = make_soup(html, tables=[table_id])
+    table = soup.find('table', attrs={'id': table_id}).find('tbody')
+    entries = []
+    for row in table.find_all('tr'):
+        player_cell = row_cells(row).get('player')
+        if player_cell is None:  # header rows repeat through the table
+            continue
+        if player_cell.get('data-append-csv') is not None:
+            player = player_cell.get('data-append-csv')
+        else:
+            player_link = player_cell.find('a')
+            if player_link:
                 try:
-                    vote_share = float(row.find('td', attrs={'data-stat': 'share'}).get_text()[:-1]) / 100.
+                    player = player_link['href'].split('/')[-1].split('.htm')[0]
                 except:
-                    vote_share = np.nan
-                award_entries.append({
-                    'year': year,
-                    'player': player,
-                    'award_type': award_type,
-                    'win': win,
-                    'vote_share': vote_share
-                })
-    award_df = pd.concat(
-        [award_df, pd.DataFrame.from_records(award_entries)],
-        ignore_index=True
-    )
-    return award_df
+                    raise ValueError('could not parse player URL')
+            else:
+                raise ValueError('could not identify player')
+        entries.append({
+            'year': year,
+            'player': player
+        })
+    return entries
+
+
+# league-wide tables loaded one season page at a time: url, parser and columns
+REFERENCE_TABLES = {
+    'draft_picks': ('https://www.pro-football-reference.com/years/{year}/draft.htm', parse_draft_picks, DRAFT_PICK_COLS),
+    'awards': ('https://www.pro-football-reference.com/awards/awards_{year}.htm', parse_awards, AWARD_COLS),
+    'all_pros': ('https://www.pro-football-reference.com/years/{year}/allpro.htm', parse_all_pros, ALL_PRO_COLS),
+    'pro_bowls': ('https://www.pro-football-reference.com/years/{year}/probowl.htm', parse_pro_bowls, PRO_BOWL_COLS)
+}
+
+
+def load_reference_table(name: str, start_year: int, end_year: int, ref_dir: str = REFERENCE_DIR, refresh: bool = False) -> pd.DataFrame:
+    '''
+    Loads a REFERENCE_TABLES table season by season. Each season is stored as its own partition
+    under ref_dir, so only seasons without one, plus the current season which can still change,
+    are scraped, and those are all fetched at once under the global rate limit. A season whose
+    page or table is missing is reported and left out instead of failing the whole load.
+    '''
+    url, parser, cols = REFERENCE_TABLES[name]
+    writer = PartitionWriter(ref_dir)
+    season = current_season()
+    years = range(start_year, end_year + 1)
+    futures = {
+        year: get_parse_pool().submit_fetched(get_fetcher().submit(url.format(year=year)), parser, year)
+        for year in years
+        if refresh or year >= season or not os.path.exists(writer.path(name, 'nfl', year))
+    }
+    for year, future in futures.items():
+        try:
+            # seasons without rows get an empty partition too, so they are not scraped again
+            writer.write(name, apply_schema(pd.DataFrame.from_records(future.result(), columns=cols)), 'nfl', year, keep_empty=True)
+        except Exception as e:
+            print(f'could not load {name} | year = {year} | {e!r}')
+    return apply_schema(read_partitions(ref_dir, name, cols, years=years), TABLE_SCHEMAS[name])
 
 
-def get_all_pros(start_year: int = 1982, end_year: int = 2022) -> pd.DataFrame:
-    all_pro_df = pd.DataFrame(columns=ALL_PRO_COLS)
-    all_pro_entries = []
-    for year in range(start_year, end_year + 1):
-        url = f'https://www.pro-football-reference.com/years/{year}/allpro.htm'
-        soup = get_soup(url)
-        all_pro_table = soup.find('table', attrs={'id': 'all_pro'}).find('tbody')
-        for row in all_pro_table.find_all('tr'):
-            row_class = row.get('class')
-            if row_class and 'thead' in row_class:
-                # print('skipping header row...')
-                continue
-            player_cell = row.find('td', attrs={'data-stat': 'player'})
-            if player_cell.get('data-append-csv') is not None:
-                player = player_cell.get('data-append-csv')
-            else:
-                player_link = player_cell.find('a')
-                if player_link:
-                    try:
-                        player = player_link['href'].split('/')[-1].split('.htm')[0]
-                    except:
-                        raise ValueError('could not parse player URL')
-                else:
-                    raise ValueError('could not identify player')
-            all_pro_entries.append({
-                'year': year,
-                'player': player
-            })
-    all_pro_df = pd.concat(
-        [all_pro_df, pd.DataFrame.from_records(all_pro_entries)],
-        ignore_index=True
-    )
-    return all_pro_df
+# tables returned by scrape_data
+SCRAPE_DATA_PLAYER_COLS = [
+    'id', 'position', 'height', 'weight', 'dob', 'draft_year', 'draft_team', 'draft_round', 'draft_pick', 'num_relatives'
+]
+
+SCRAPE_DATA_SEASON_COLS = [
+    'player', 'year', 'team', 'age', 'g', 'gs', 'qb_win', 'qb_loss', 'qb_draw', 'qb_rate', 'qb_fqc', 'qb_gwd', 'pass_comp',
+    'pass_att', 'pass_yd', 'pass_td', 'pass_int', 'pass_1d', 'pass_long', 'rush_att', 'rush_yd', 'rush_td', 'rush_1d',
+    'rush_long', 'rec', 'rec_tgt', 'rec_yd', 'rec_td', 'rec_1d', 'rec_long', 'pfr_av', 'awards'
+]
 
+SCRAPE_DATA_GAME_COLS = [
+    'player', 'year', 'date', 'game_num', 'week_num', 'team', 'opp', 'home', 'result', 'start', 'qb_rate', 'pass_comp',
+    'pass_att', 'pass_yd', 'pass_td', 'pass_int', 'rush_att', 'rush_yd', 'rush_td', 'rec', 'rec_tgt', 'rec_yd', 'rec_td'
+]
 
-def get_pro_bowls(start_year: int = 1982, end_year: int = 2022) -> pd.DataFrame:
-    pro_bowl_df = pd.DataFrame(columns=PRO_BOWL_COLS)
-    pro_bowl_entries = []
-    for year in range(start_year, end_year + 1):
-        url = f'https://www.pro-football-reference.com/years/{year}/probowl.htm'
-        soup = get_soup(url)
-        pro_bowl_table = soup.find('table', attrs={'id': 'pro_bowl'}).find('tbody')
-        for row in pro_bowl_table.find_all('tr'):
-            player_cell = row.find('td', attrs={'data-stat': 'player'})
-            if player_cell.get('data-append-csv') is not None:
-                player = player_cell.get('data-append-csv')
-            else:
-                player_link = player_cell.find('a')
-                if player_link:
-                    try:
-                        player = player_link['href'].split('/')[-1].split('.htm')[0]
-                    except:
-                        raise ValueError('could not parse player URL')
-                else:
-                    raise ValueError('could not identify player')
-            pro_bowl_entries.append({
-                'year': year,
-                'player': player
-            })
-    pro_bowl_df = pd.concat(
-        [pro_bowl_df, pd.DataFrame.from_records(pro_bowl_entries)],
-        ignore_index=True
-    )
-    return pro_bowl_df
+# cells backing SCRAPE_DATA_GAME_COLS; player is set by the parser
+SCRAPE_DATA_GAME_SPEC = {
+    **{col: PLAYER_GAME_SPEC[col] for col in ('year', 'date', 'team', 'opp', 'home')},
+    'game_num': Col('game_num', int),
+    'week_num': Col('week_num', int),
+    'result': Col('game_result', lambda text: text[0].upper()),
+    'start': Col('gs', bool, False),
+    **{col: PLAYER_GAME_SPEC[col] for col in SCRAPE_DATA_GAME_COLS[SCRAPE_DATA_GAME_COLS.index('qb_rate'):]}
+}
+
+
+def parse_qb_record(text: str) -> tuple:
+    '''
+    '10-6-1' -> (10, 6, 1)
+    '''
+    win, loss, draw = text.split('-')[:3]
+    return int(win), int(loss), int(draw)
+
+
+def parse_av(text: str) -> int:
+    '''
+    Approximate value of a season row, 0 when it is not a number
+    '''
+    try:
+        return int(text)
+    except ValueError:
+        return 0
+
+
+# cells of a player page season row, taken from the first table row of each year
+SCRAPE_DATA_SEASON_SPEC = {
+    'age': Col('age', int),
+    'team': Col('team', href=2),
+    'g': Col('g', int),
+    'gs': Col('gs', int)
+}
+
+# cells every season table adds to its year, None (a missing cell) leaves the value alone
+SCRAPE_DATA_SEASON_EXTRA_SPEC = {
+    'awards': Col('awards', lambda text: len([award for award in text.split(', ') if award]), None, blank=0),
+    'pfr_av': Col('av', parse_av, None, blank=0)
+}
+
+SCRAPE_DATA_PASSING_SPEC = {
+    'qb_rate': Col('pass_rating', float, 0.),
+    'qb_fqc': Col('comebacks', int, 0),
+    'qb_gwd': Col('gwd', int, 0),
+    'pass_comp': Col('pass_cmp', int, 0),
+    'pass_att': Col('pass_att', int, 0),
+    'pass_yd': Col('pass_yds', int, 0),
+    'pass_td': Col('pass_td', int, 0),
+    'pass_int': Col('pass_int', int, 0),
+    'pass_1d': Col('pass_first_down', int, 0),
+    'pass_long': Col('pass_long', int, 0)
+}
+
+QB_RECORD_COL = Col('qb_rec', parse_qb_record, (0, 0, 0))
+
+SCRAPE_DATA_RUSH_REC_SPEC = {
+    'rush_att': Col('rush_att', int, 0),
+    'rush_yd': Col('rush_yds', int, 0),
+    'rush_td': Col('rush_td', int, 0),
+    'rush_1d': Col('rush_first_down', int, 0),
+    'rush_long': Col('rush_long', int, 0),
+    'rec': Col('rec', int, 0),
+    'rec_tgt': Col('targets', int, 0),
+    'rec_yd': Col('rec_yds', int, 0),
+    'rec_td': Col('rec_td', int, 0),
+    'rec_1d': Col('rec_first_down', int, 0),
+    'rec_long': Col('rec_long', int, 0)
+}
+
+SEASON_YEAR_CSK = re.compile('^[0-9]{4}')
 
 
 def scrape_data(start: int = 2021, end: int = 2021, player_count: int = SCRAPE_PLAYER_COUNT) -> dict:
-
-    players = pd.DataFrame(columns=['id', 'position', 'height', 'weight', 'dob',
-                                    'draft_year', 'draft_team', 'draft_round', 'draft_pick', 'num_relatives'])
-    seasons = pd.DataFrame(columns=['player', 'year', 'team', 'age', 'g', 'gs', 'qb_win', 'qb_loss', 'qb_draw', 'qb_rate', 'qb_fqc', 'qb_gwd', 'pass_comp', 'pass_att', 'pass_yd', 'pass_td',
-                                    'pass_int', 'pass_1d', 'pass_long', 'rush_att', 'rush_yd', 'rush_td', 'rush_1d', 'rush_long', 'rec', 'rec_tgt', 'rec_yd', 'rec_td', 'rec_1d', 'rec_long', 'pfr_av', 'awards'])
-    games = pd.DataFrame(columns=['player', 'year', 'date', 'game_num', 'week_num', 'team', 'opp', 'home', 'result', 'start', 'qb_rate',
-                                  'pass_comp', 'pass_att', 'pass_yd', 'pass_td', 'pass_int', 'rush_att', 'rush_yd', 'rush_td', 'rec', 'rec_tgt', 'rec_yd', 'rec_td'])
-    player_ids = get_player_universe(start, end)
-    for player_id in player_ids[:player_count]:
+    players = TableBuffer(SCRAPE_DATA_PLAYER_COLS)
+    seasons = TableBuffer(SCRAPE_DATA_SEASON_COLS)
+    games = TableBuffer(SCRAPE_DATA_GAME_COLS)
+    player_ids = get_player_universe(start, end)[:player_count]
+    # download every player's pages in the background while earlier players are parsed
+    get_fetcher().prefetch([url for player_id in player_ids for url in get_player_urls(player_id)])
+    for player_id in player_ids:
         player_df, season_df = scrape_player(player_id)
         game_df = scrape_player_gamelogs(player_id)
-        players = pd.concat([players, player_df], ignore_index=True)
-        seasons = pd.concat([seasons, season_df], ignore_index=True)
-        games = pd.concat([games, game_df], ignore_index=True)
+        players.append(player_df)
+        seasons.append(season_df)
+        games.append(game_df)
     return {
-        'players': players,
-        'seasons': seasons,
-        'games': games
+        'players': players.frame(),
+        'seasons': seasons.frame(),
+        'games': games.frame()
     }
 
 
-def get_player_universe(start: int, end: int, n: int = SCRAPE_PLAYER_COUNT):
-    player_ids = []
-    for year in range(start, end + 1):
-        url = f'https://www.pro-football-reference.com/years/{year}/fantasy.htm'
-        # sleep to ensure we don't violate PFF rate limiting guidelines
-        time.sleep(3)
-        print(f'scraping {url}\n')
-        html = urlopen(url)
-        soup = BeautifulSoup(html, features="lxml")
-        year_player_ids = [td.a['href'].split(
-            '/')[3].split('.htm')[0] for td in soup.find_all('td', attrs={'data-stat': 'player'})][:n]
-        # only add net new players each year
-        player_ids.extend(
-            [player_id for player_id in year_player_ids if player_id not in player_ids])
-    return player_ids
+@traced
+def get_player_universe(start: int, end: int, n: int = SCRAPE_PLAYER_COUNT) -> list:
+    '''
+    Ids of the top n fantasy players of each season, in order of first appearance
+    '''
+    universe = build_player_universe(start, end, n)
+    return list(dict.fromkeys(universe.player))
+
+
+# columns of build_player_universe, one row per player and season
+PLAYER_UNIVERSE_COLS = ['player', 'year', 'rank', 'position', 'position_rank', 'games', 'points', 'points_ppr']
+
+# cells backing PLAYER_UNIVERSE_COLS; year is set by the parser
+FANTASY_RANK_SPEC = {
+    'player': Col('player', lambda segment: segment.split('.htm')[0], href=3),
+    'rank': Col('ranker', int),
+    'position': Col('fantasy_pos', blank=''),
+    'position_rank': Col('fantasy_rank_pos', int),
+    'games': Col('g', int, 0),
+    'points': Col('fantasy_points', float, 0.),
+    'points_ppr': Col('fantasy_points_ppr', float, 0.)
+}
+
+
+@traced
+def build_player_universe(start: int, end: int, n: int = None) -> pd.DataFrame:
+    '''
+    Fantasy rank and points of every player (or the top n) of each season from start to end.
+    The season pages are fetched concurrently through the cached, rate limited fetcher and
+    parsed as they arrive, so a multi-decade universe is built in one pass.
+    '''
+    futures = [
+        get_parse_pool().submit_fetched(
+            get_fetcher().submit(f'https://www.pro-football-reference.com/years/{year}/fantasy.htm'),
+            parse_fantasy_ranks,
+            year
+        )
+        for year in range(start, end + 1)
+    ]
+    return pd.DataFrame.from_records(
+        [record for future in futures for record in future.result()[:n]],
+        columns=PLAYER_UNIVERSE_COLS
+    )
+
+
+def parse_fantasy_ranks(html: bytes, year: int) -> list:
+    '''
+    Parses a season fantasy page into PLAYER_UNIVERSE_COLS records in rank order, safe to run in
+    a ParsePool worker
+    '''
+    soup = make_soup(html, tables=['fantasy'])
+    records = []
+    for row in soup.find_all('tr'):
+        record = extract_row(row_cells(row), FANTASY_RANK_SPEC)
+        if isinstance(record['player'], str):  # header rows repeat through the table
+            records.append({'year': year, **record})
+    return records
 
 
+@traced
 def scrape_player_gamelogs(player_id: str):
-    game_df = pd.DataFrame(columns=['player', 'year', 'date', 'game_num', 'week_num', 'team', 'opp', 'home', 'result', 'start', 'qb_rate',
-                                    'pass_comp', 'pass_att', 'pass_yd', 'pass_td', 'pass_int', 'rush_att', 'rush_yd', 'rush_td', 'rec', 'rec_tgt', 'rec_yd', 'rec_td'])
     url = f'https://www.pro-football-reference.com/players/{player_id[0]}/{player_id}/gamelog'
-    print(f'scraping {url}\n')
-    try:
-        html = urlopen(url)
-        soup = BeautifulSoup(html, features="lxml")
-    except Exception as e:
-        print(f'encountered exception: {e}')
-        time.sleep(1)
-        html = urlopen(url)
-        soup = BeautifulSoup(html, features="lxml")
+    return pd.DataFrame.from_records(parse_scrape_data_games(get_html(url), player_id), columns=SCRAPE_DATA_GAME_COLS)
+
+
+def parse_scrape_data_games(html: bytes, player_id: str) -> list:
+    '''
+    Parses the games a player played from a gamelog page into scrape_data game records, safe to
+    run in a ParsePool worker
+    '''
+    soup = make_soup(html, tables=['stats'])
     stat_table = soup.find('table', attrs={'id': 'stats'})
     game_entries = []
-    for row in stat_table.find_all('tr', attrs={'id': re.compile('stats.[0-9]')}):
-        try:
-            year = row.find_next(
-                'td', attrs={'data-stat': 'year_id'}).get_text()
-        except:
-            year = None
-        try:
-            date = row.find_next(
-                'td', attrs={'data-stat': 'game_date'}).get_text()
-        except:
-            date = None
-        try:
-            game_num = row.find_next(
-                'td', attrs={'data-stat': 'game_num'}).get_text()
-        except:
-            game_num = None
-        try:
-            week_num = row.find_next(
-                'td', attrs={'data-stat': 'week_num'}).get_text()
-        except:
-            week_num = None
-        try:
-            team = row.find_next(
-                'td', attrs={'data-stat': 'team'}).a['href'].split('/')[2]
-        except:
-            team = None
-        try:
-            opp = row.find_next(
-                'td', attrs={'data-stat': 'opp'}).a['href'].split('/')[2]
-        except:
-            opp = None
-        try:
-            at = row.find_next(
-                'td', attrs={'data-stat': 'game_location'}).get_text()
-            if at:
-                home = False
-            else:
-                home = True
-        except:
-            home = None
-        try:
-            gs = row.find_next('td', attrs={'data-stat': 'gs'}).get_text()
-            if gs:
-                start = True
-            else:
-                start = False
-        except:
-            start = None
-        try:
-            result = row.find_next(
-                'td', attrs={'data-stat': 'game_result'}).get_text()[0].upper()
-        except:
-            result = None
-        try:
-            pass_comp = row.find_next(
-                'td', attrs={'data-stat': 'pass_cmp'}).get_text()
-        except:
-            pass_comp = 0
-        try:
-            pass_att = row.find_next(
-                'td', attrs={'data-stat': 'pass_att'}).get_text()
-        except:
-            pass_att = 0
-        try:
-            pass_yd = row.find_next(
-                'td', attrs={'data-stat': 'pass_yds'}).get_text()
-        except:
-            pass_yd = 0
-        try:
-            pass_td = row.find_next(
-                'td', attrs={'data-stat': 'pass_td'}).get_text()
-        except:
-            pass_td = 0
-        try:
-            pass_int = row.find_next(
-                'td', attrs={'data-stat': 'pass_int'}).get_text()
-        except:
-            pass_int = 0
-        try:
-            qb_rate = row.find_next(
-                'td', attrs={'data-stat': 'pass_rating'}).get_text()
-        except:
-            qb_rate = 0
-        try:
-            rush_att = row.find_next(
-                'td', attrs={'data-stat': 'rush_att'}).get_text()
-        except:
-            rush_att = 0
-        try:
-            rush_yd = row.find_next(
-                'td', attrs={'data-stat': 'rush_yds'}).get_text()
-        except:
-            rush_yd = 0
-        try:
-            rush_td = row.find_next(
-                'td', attrs={'data-stat': 'rush_td'}).get_text()
-        except:
-            rush_td = 0
-        try:
-            rec_tgt = row.find_next(
-                'td', attrs={'data-stat': 'targets'}).get_text()
-        except:
-            rec_tgt = 0
-        try:
-            rec = row.find_next('td', attrs={'data-stat': 'rec'}).get_text()
-        except:
-            rec = 0
-        try:
-            rec_yd = row.find_next(
-                'td', attrs={'data-stat': 'rec_yds'}).get_text()
-        except:
-            rec_yd = 0
-        try:
-            rec_td = row.find_next(
-                'td', attrs={'data-stat': 'rec_td'}).get_text()
-        except:
-            rec_td = 0
-        game_entry = {
-            'player': player_id,
-            'year': year,
-            'date': date,
-            'game_num': game_num,
-            'week_num': week_num,
-            'team': team,
-            'opp': opp,
-            'home': home,
-            'result': result,
-            'start': start,
-            'pass_comp': pass_comp,
-            'pass_att': pass_att,
-            'pass_yd': pass_yd,
-            'pass_td': pass_td,
-            'pass_int': pass_int,
-            'qb_rate': qb_rate,
-            'rush_att': rush_att,
-            'rush_yd': rush_yd,
-            'rush_td': rush_td,
-            'rec_tgt': rec_tgt,
-            'rec': rec,
-            'rec_yd': rec_yd,
-            'rec_td': rec_td
-        }
-        game_entries.append(game_entry)
-    game_df = pd.concat(
-        [game_df, pd.DataFrame.from_records(game_entries)], ignore_index=True)
-    return game_df
+    if stat_table:
+        for row in stat_table.find_all('tr', attrs={'id': PLAYER_GAME_ROW_ID}):
+            game_entries.append({'player': player_id, **extract_row(row_cells(row), SCRAPE_DATA_GAME_SPEC)})
+    return game_entries
 
 
+@traced
 def scrape_player(player_id: str):
-    player_df = pd.DataFrame(columns=['id', 'position', 'height', 'weight', 'dob',
-                                      'draft_year', 'draft_team', 'draft_round', 'draft_pick', 'num_relatives'])
-    season_df = pd.DataFrame(columns=['player', 'year', 'team', 'age', 'g', 'gs', 'qb_win', 'qb_loss', 'qb_draw', 'qb_rate', 'qb_fqc', 'qb_gwd', 'pass_comp', 'pass_att', 'pass_yd', 'pass_td',
-                                      'pass_int', 'pass_1d', 'pass_long', 'rush_att', 'rush_yd', 'rush_td', 'rush_1d', 'rush_long', 'rec', 'rec_tgt', 'rec_yd', 'rec_td', 'rec_1d', 'rec_long', 'pfr_av', 'awards'])
     url = f'https://www.pro-football-reference.com/players/{player_id[0]}/{player_id}.htm'
-    time.sleep(2)
-    print(f'scraping {url}\n')
-    try:
-        html = urlopen(url)
-        soup = BeautifulSoup(html, features="lxml")
-    except:
-        time.sleep(10)
-        html = urlopen(url)
-        soup = BeautifulSoup(html, features="lxml")
+    soup = get_soup(url)
     try:
         position = re.search('(?:QB|WR|TE|RB)', soup.find(
             'strong', string='Position').parent.get_text()).group(0)
@@ -1814,255 +2136,46 @@ def scrape_player(player_id: str):
         'draft_year': [draft_year],
         'num_relatives': [relatives]
     }
-    player_df = pd.concat(
-        [player_df, pd.DataFrame.from_dict(player_entry)], ignore_index=True)
-
-    season_entries = []
-    passing = soup.find('table', id='passing')
-    if passing:
-        for row in passing.find_all('th', attrs={'data-stat': 'year_id', 'csk': re.compile('^[0-9]{4}')}):
-            year = row.get_text()
-            if not year:
+    player_df = pd.DataFrame.from_dict(player_entry)[SCRAPE_DATA_PLAYER_COLS]
+    season_df = pd.DataFrame.from_records(parse_scrape_data_seasons(soup, player_id), columns=SCRAPE_DATA_SEASON_COLS)
+    return player_df, season_df
+
+
+def parse_scrape_data_seasons(soup: BeautifulSoup, player_id: str) -> list:
+    '''
+    Merges a player page's passing and rushing/receiving table rows into one season record per
+    year, the first row of a year supplies its team, age and games
+    '''
+    season_entries = {}
+    rush_rec = soup.find('table', id='rushing_and_receiving') or soup.find('table', id='receiving_and_rushing')
+    for table, spec in ((soup.find('table', id='passing'), SCRAPE_DATA_PASSING_SPEC), (rush_rec, SCRAPE_DATA_RUSH_REC_SPEC)):
+        if not table:
+            continue
+        for row in table.find_all('tr'):
+            cells = row_cells(row)
+            year_cell = cells.get('year_id')
+            if year_cell is None or not SEASON_YEAR_CSK.match(year_cell.get('csk', '')):
                 continue
-            year = year[:4]
-            age = row.find_next('td', attrs={'data-stat': 'age'}).get_text()
-            team_cell = row.find_next('td', attrs={'data-stat': 'team'})
-            try:
-                team = team_cell.a['href'].split('/')[2]
-            except:
-                team = team_cell.get_text()
-            g = int(row.find_next('td', attrs={'data-stat': 'g'}).get_text())
-            gs = int(row.find_next('td', attrs={'data-stat': 'gs'}).get_text())
-            awards_cell = row.find_next('td', attrs={'data-stat': 'awards'})
-            awards = None
-            if awards_cell is not None:
-                try:
-                    awards = len(
-                        [a for a in awards_cell.get_text().split(', ') if a])
-                except:
-                    awards = 0
-            av_cell = row.find_next('td', attrs={'data-stat': 'av'})
-            av = None
-            if av_cell is not None:
-                try:
-                    av = int(av_cell.get_text())
-                except:
-                    av = 0
-            if year not in [entry.get('year') for entry in season_entries]:
-                season_entries.append(
-                    {
-                        'player': player_id,
-                        'year': year,
-                        'age': age,
-                        'team': team,
-                        'g': g,
-                        'gs': gs
-                    }
-                )
-            season_entry = next(
-                entry for entry in season_entries if entry.get('year') == year)
-            try:
-                record_str = row.find_next(
-                    'td', attrs={'data-stat': 'qb_rec'}).get_text()
-                record = record_str.split('-') if record_str else []
-                qb_win = record[0]
-                qb_loss = record[1]
-                qb_draw = record[2]
-            except:
-                qb_win = 0
-                qb_loss = 0
-                qb_draw = 0
-            try:
-                qb_rate = float(row.find_next(
-                    'td', attrs={'data-stat': 'pass_rating'}).get_text())
-            except:
-                qb_rate = 0
             try:
-                qb_4qc = int(row.find_next(
-                    'td', attrs={'data-stat': 'comebacks'}).get_text())
-            except:
-                qb_4qc = 0
-            try:
-                qb_gwd = int(row.find_next(
-                    'td', attrs={'data-stat': 'gwd'}).get_text())
-            except:
-                qb_gwd = 0
-            try:
-                pass_comp = int(row.find_next(
-                    'td', attrs={'data-stat': 'pass_cmp'}).get_text())
-            except:
-                pass_comp = 0
-            try:
-                pass_att = int(row.find_next(
-                    'td', attrs={'data-stat': 'pass_att'}).get_text())
-            except:
-                pass_att = 0
-            try:
-                pass_yd = int(row.find_next(
-                    'td', attrs={'data-stat': 'pass_yds'}).get_text())
-            except:
-                pass_yd = 0
-            try:
-                pass_td = int(row.find_next(
-                    'td', attrs={'data-stat': 'pass_td'}).get_text())
-            except:
-                pass_td = 0
-            try:
-                pass_int = int(row.find_next(
-                    'td', attrs={'data-stat': 'pass_int'}).get_text())
-            except:
-                pass_int = 0
-            try:
-                pass_1d = int(row.find_next(
-                    'td', attrs={'data-stat': 'pass_first_down'}).get_text())
-            except:
-                pass_1d = 0
-            try:
-                pass_long = int(row.find_next(
-                    'td', attrs={'data-stat': 'pass_long'}).get_text())
-            except:
-                pass_long = 0
-            row_stats = {
-                'qb_win': qb_win,
-                'qb_loss': qb_loss,
-                'qb_draw': qb_draw,
-                'qb_rate': qb_rate,
-                'qb_fqc': qb_4qc,
-                'qb_gwd': qb_gwd,
-                'pass_comp': pass_comp,
-                'pass_att': pass_att,
-                'pass_yd': pass_yd,
-                'pass_td': pass_td,
-                'pass_int': pass_int,
-                'pass_1d': pass_1d,
-                'pass_long': pass_long
-            }
-            if awards is not None:
-                row_stats['awards'] = awards
-            if av is not None:
-                row_stats['pfr_av'] = av
-            season_entry.update(row_stats)
-    rush_rec = soup.find('table', id='rushing_and_receiving')
-    if not rush_rec:
-        rush_rec = soup.find('table', id='receiving_and_rushing')
-    if rush_rec:
-        for row in rush_rec.find_all('th', attrs={'data-stat': 'year_id', 'csk': re.compile('^[0-9]{4}')}):
-            year = row.get_text()
-            if not year:
+                year = int(year_cell.get_text()[:4])
+            except ValueError:
                 continue
-            year = year[:4]
-            age = row.find_next('td', attrs={'data-stat': 'age'}).get_text()
-            team_cell = row.find_next('td', attrs={'data-stat': 'team'})
-            try:
-                team = team_cell.a['href'].split('/')[2]
-            except:
-                team = team_cell.get_text()
-            g = int(row.find_next('td', attrs={'data-stat': 'g'}).get_text())
-            gs = int(row.find_next('td', attrs={'data-stat': 'gs'}).get_text())
-            awards_cell = row.find_next('td', attrs={'data-stat': 'awards'})
-            awards = None
-            if awards_cell is not None:
-                try:
-                    awards = len(
-                        [a for a in awards_cell.get_text().split(', ') if a])
-                except:
-                    awards = 0
-            av_cell = row.find_next('td', attrs={'data-stat': 'av'})
-            av = None
-            if av_cell is not None:
-                try:
-                    av = int(av_cell.get_text())
-                except:
-                    av = 0
-            if year not in [entry.get('year') for entry in season_entries]:
-                season_entries.append(
-                    {
-                        'player': player_id,
-                        'year': year,
-                        'age': age,
-                        'team': team,
-                        'g': g,
-                        'gs': gs
-                    }
-                )
-            season_entry = next(
-                entry for entry in season_entries if entry.get('year') == year)
-            try:
-                rush_att = int(row.find_next(
-                    'td', attrs={'data-stat': 'rush_att'}).get_text())
-            except:
-                rush_att = 0
-            try:
-                rush_yd = int(row.find_next(
-                    'td', attrs={'data-stat': 'rush_yds'}).get_text())
-            except:
-                rush_yd = 0
-            try:
-                rush_td = int(row.find_next(
-                    'td', attrs={'data-stat': 'rush_td'}).get_text())
-            except:
-                rush_td = 0
-            try:
-                rush_1d = int(row.find_next(
-                    'td', attrs={'data-stat': 'rush_first_down'}).get_text())
-            except:
-                rush_1d = 0
-            try:
-                rush_long = int(row.find_next(
-                    'td', attrs={'data-stat': 'rush_long'}).get_text())
-            except:
-                rush_long = 0
-            try:
-                rec = int(row.find_next(
-                    'td', attrs={'data-stat': 'rec'}).get_text())
-            except:
-                rec = 0
-            try:
-                rec_tgt = int(row.find_next(
-                    'td', attrs={'data-stat': 'targets'}).get_text())
-            except:
-                rec_tgt = 0
-            try:
-                rec_yd = int(row.find_next(
-                    'td', attrs={'data-stat': 'rec_yds'}).get_text())
-            except:
-                rec_yd = 0
-            try:
-                rec_td = int(row.find_next(
-                    'td', attrs={'data-stat': 'rec_td'}).get_text())
-            except:
-                rec_td = 0
-            try:
-                rec_1d = int(row.find_next(
-                    'td', attrs={'data-stat': 'rec_first_down'}).get_text())
-            except:
-                rec_1d = 0
-            try:
-                rec_long = int(row.find_next(
-                    'td', attrs={'data-stat': 'rec_long'}).get_text())
-            except:
-                rec_long = 0
-            row_stats = {
-                'rush_att': rush_att,
-                'rush_yd': rush_yd,
-                'rush_td': rush_td,
-                'rush_1d': rush_1d,
-                'rush_long': rush_long,
-                'rec': rec,
-                'rec_tgt': rec_tgt,
-                'rec_yd': rec_yd,
-                'rec_td': rec_td,
-                'rec_1d': rec_1d,
-                'rec_long': rec_long
-            }
-            if awards is not None:
-                row_stats['awards'] = awards
-            if av is not None:
-                row_stats['pfr_av'] = av
-            season_entry.update(row_stats)
-    season_df = pd.concat(
-        [season_df, pd.DataFrame.from_records(season_entries)], ignore_index=True)
-    return player_df, season_df
+            season_entry = season_entries.get(year)
+            if season_entry is None:
+                season_entry = season_entries[year] = {
+                    'player': player_id,
+                    'year': year,
+                    **extract_row(cells, SCRAPE_DATA_SEASON_SPEC)
+                }
+                if not isinstance(season_entry['team'], str):  # no team link, e.g. 2TM
+                    season_entry['team'] = cells['team'].get_text() if 'team' in cells else np.nan
+            if spec is SCRAPE_DATA_PASSING_SPEC:
+                season_entry['qb_win'], season_entry['qb_loss'], season_entry['qb_draw'] = QB_RECORD_COL.extract(cells)
+            season_entry.update(extract_row(cells, spec))
+            season_entry.update({
+                col: value for col, value in extract_row(cells, SCRAPE_DATA_SEASON_EXTRA_SPEC).items() if value is not None
+            })
+    return list(season_entries.values())
 
 
 def move_column_inplace(df, col, pos):
@@ -2085,17 +2198,67 @@ def calc_fantasy_points(row):
     return row.rec*1.0 + row.pass_yd*0.04 + sum([row.rush_yd, row.rec_yd])*0.1 + sum([row.pass_td, row.rush_td, row.rec_td])*6
 
 
-def get_soup(url: str, sleep: float or int = 3):
-    time.sleep(sleep)
-    try:
-        print(f'scraping {url}')
-        html = urlopen(url)
-        soup = BeautifulSoup(html, features="lxml")
-    except:  # pause and retry the request
-        time.sleep(sleep)
-        html = urlopen(url)
-        soup = BeautifulSoup(html, features="lxml")
-    return soup
+def get_html(url: str, refresh: bool = False, fetcher: Fetcher = None) -> bytes:
+    '''
+    Fetches raw page html, serving from the page cache when fresh. Cache hits skip the
+    rate limiter entirely; refresh=True forces a network fetch.
+    '''
+    return (fetcher or get_fetcher()).fetch(url, refresh=refresh)
+
+
+def get_soup(url: str, refresh: bool = False, fetcher: Fetcher = None, tables: list = None):
+    '''
+    Fetches and parses a page. Passing the ids of the tables a scraper needs parses only those
+    tables, including ones shipped inside html comments, instead of the whole document.
+    '''
+    html = get_html(url, refresh=refresh, fetcher=fetcher)
+    return make_soup(html, tables=tables)
+
+
+def get_soups(urls: dict, skip_errors: bool = False, fetcher: Fetcher = None, tables: list = None):
+    '''
+    Submits all urls to the fetcher at once and yields (key, soup) in order, so each page is
+    parsed while the remaining ones download
+    '''
+    fetcher = fetcher or get_fetcher()
+    keys = {url: key for key, url in urls.items()}
+    for url, future in fetcher.fetch_many(list(urls.values())):
+        try:
+            html = future.result()
+        except Exception as e:
+            if not skip_errors:
+                raise
+            print(f'could not fetch {url}: {e}')
+            continue
+        yield keys[url], make_soup(html, tables=tables)
+
+
+# parsers for re-parsing cached pages: url class -> (parser, columns, parser args from url)
+CACHE_PARSERS = {
+    'player_gamelog': (parse_player_games, PLAYER_GAME_COLS, lambda url: (url.split('/')[-2],)),
+    'team_gamelog': (parse_team_games, TEAM_GAME_COLS, lambda url: (url.split('/')[-3], int(url.split('/')[-2])))
+}
+
+
+def reparse_cache(url_class: str, cache: PageCache = None, pool: ParsePool = None) -> pd.DataFrame:
+    '''
+    Re-parses every cached page of a url class across the parse pool without touching the network,
+    e.g. to rebuild player_games after a parser fix
+    '''
+    cache = cache or get_page_cache()
+    parser, cols, parser_args = CACHE_PARSERS[url_class]
+
+    def jobs():
+        for entry in cache.entries(url_class):
+            html = cache.get(entry['url'], stale=True)
+            if html is not None:
+                yield (html, *parser_args(entry['url']))
+
+    records = [record for page_records in (pool or get_parse_pool()).imap(parser, jobs()) for record in page_records]
+    return pd.concat(
+        [pd.DataFrame(columns=cols), pd.DataFrame.from_records(records)],
+        ignore_index=True
+    )
 
 
 def get_season_games(year: int, team: str = None):
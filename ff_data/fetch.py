@@ -0,0 +1,409 @@
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from cache import PageCache
+from constants import (PFR_BASE_URL, PFR_REQUESTS_PER_MINUTE, FETCH_WORKERS, FETCH_MAX_RETRIES, BACKOFF_BASE, BACKOFF_CAP,
+                       BREAKER_THRESHOLD, BREAKER_COOLDOWN)
+from instrument import TRACER
+from session import FetchError, HttpSession
+
+
+class TokenBucket:
+    '''
+    Thread-safe token bucket, acquire() blocks until a request may be sent
+    '''
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate  # tokens per second
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class SharedRateBudget:
+    '''
+    Token bucket in a SQLite file shared by every scrape worker, so together they stay within one
+    request rate. A throttling pause set by any worker holds back all of them.
+    '''
+
+    def __init__(self, path: str, rate: float = PFR_REQUESTS_PER_MINUTE / 60., capacity: int = 1):
+        self.path = path
+        self.rate = rate
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS budget (id INTEGER PRIMARY KEY CHECK (id = 1), tokens REAL, updated REAL, paused_until REAL)'
+        )
+        self._conn.execute('INSERT OR IGNORE INTO budget VALUES (1, ?, ?, 0)', (float(capacity), time.time()))
+
+    def _transaction(self, update):
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                tokens, updated, paused_until = self._conn.execute(
+                    'SELECT tokens, updated, paused_until FROM budget WHERE id = 1'
+                ).fetchone()
+                # wall clock, it is the only clock the workers share
+                now = time.time()
+                tokens = min(self.capacity, tokens + max(now - updated, 0) * self.rate)
+                tokens, paused_until, result = update(now, tokens, paused_until)
+                self._conn.execute(
+                    'UPDATE budget SET tokens = ?, updated = ?, paused_until = ? WHERE id = 1', (tokens, now, paused_until)
+                )
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+        return result
+
+    def acquire(self):
+        def take(now, tokens, paused_until):
+            if now < paused_until:
+                return tokens, paused_until, paused_until - now
+            if tokens >= 1:
+                return tokens - 1, paused_until, 0
+            return tokens, paused_until, (1 - tokens) / self.rate
+
+        while True:
+            wait = self._transaction(take)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        self._transaction(lambda now, tokens, paused_until: (tokens, max(paused_until, now + seconds), None))
+
+    def close(self):
+        self._conn.close()
+
+
+class CircuitOpenError(OSError):
+    pass
+
+
+class MissingPageError(OSError):
+    pass
+
+
+class RateController(TokenBucket):
+    '''
+    Token bucket at up to the PFR limit that halves its rate on a 429 and recovers on success, with
+    a circuit breaker for outages. A SharedRateBudget extends the limit to every scrape worker.
+    '''
+
+    def __init__(self,
+                 rate: float = PFR_REQUESTS_PER_MINUTE / 60.,
+                 min_rate: float = None,
+                 backoff_base: float = BACKOFF_BASE,
+                 backoff_cap: float = BACKOFF_CAP,
+                 breaker_threshold: int = BREAKER_THRESHOLD,
+                 breaker_cooldown: float = BREAKER_COOLDOWN,
+                 fail_fast: bool = False,
+                 budget: SharedRateBudget = None):
+        super().__init__(rate)
+        self.max_rate = rate
+        self.min_rate = min_rate or rate / 8
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.fail_fast = fail_fast
+        self.budget = budget
+        self.failures = 0
+        self.paused_until = 0.
+        self.opened_at = None
+        self.probing = False
+        self.stats = {'requests': 0, 'throttled': 0, 'failures': 0, 'breaker_trips': 0, 'backoff_s': 0.}
+        self._sent = deque()
+        self._started = time.monotonic()
+        self._state = threading.Condition()
+
+    def acquire(self):
+        with self._state:
+            while True:
+                now = time.monotonic()
+                if self.opened_at is not None:
+                    reopen_at = self.opened_at + self.breaker_cooldown
+                    if now < reopen_at or self.probing:
+                        if self.fail_fast:
+                            raise CircuitOpenError('circuit open, PFR requests are failing')
+                        self._state.wait(max(reopen_at - now, 0.1))
+                        continue
+                # a 429 pause can outlast the cooldown, wait it out before claiming the probe
+                if now < self.paused_until:
+                    self._state.wait(self.paused_until - now)
+                    continue
+                if self.opened_at is not None:
+                    self.probing = True  # half open, this caller's request is the probe
+                break
+        super().acquire()
+        if self.budget is not None:
+            self.budget.acquire()
+        with self._state:
+            now = time.monotonic()
+            self._sent.append(now)
+            while self._sent and self._sent[0] < now - 60:
+                self._sent.popleft()
+            self.stats['requests'] += 1
+
+    def success(self):
+        with self._state:
+            self.failures = 0
+            if self.opened_at is not None:
+                self.opened_at = None
+                self.probing = False
+                self._state.notify_all()
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def backoff(self, retry_after: float = None) -> float:
+        '''
+        Exponential backoff with full jitter for the current failure streak
+        '''
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** self.failures))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def throttled(self, retry_after: float = None) -> float:
+        '''
+        Records a 429, pausing all requests and halving the rate. Returns the pause in seconds.
+        '''
+        with self._state:
+            self.stats['throttled'] += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            delay = self.backoff(retry_after)
+            self.failures += 1
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+            self.stats['backoff_s'] += delay
+            self._trip()
+        if self.budget is not None:
+            self.budget.pause(delay)
+        return delay
+
+    def failure(self) -> float:
+        '''
+        Records a failed request (5xx, timeout, connection error), returns the backoff delay
+        '''
+        with self._state:
+            self.stats['failures'] += 1
+            delay = self.backoff()
+            self.failures += 1
+            self.stats['backoff_s'] += delay
+            self._trip()
+            return delay
+
+    def _trip(self):
+        if self.probing:  # the probe failed, stay open for another cooldown
+            self.probing = False
+            self.opened_at = time.monotonic()
+            self.stats['breaker_trips'] += 1
+        elif self.opened_at is None and self.failures >= self.breaker_threshold:
+            self.opened_at = time.monotonic()
+            self.stats['breaker_trips'] += 1
+            print(f'{self.failures} consecutive request failures, pausing requests for {self.breaker_cooldown}s')
+        self._state.notify_all()
+
+    def effective_rate(self) -> float:
+        '''
+        Requests sent per minute over the last minute
+        '''
+        with self._state:
+            now = time.monotonic()
+            while self._sent and self._sent[0] < now - 60:
+                self._sent.popleft()
+            window = min(60., max(now - self._started, 1.))
+            return len(self._sent) * 60. / window
+
+    def report(self) -> dict:
+        return {
+            **self.stats,
+            'effective_rpm': round(self.effective_rate(), 2),
+            'rate_rpm': round(self.rate * 60, 2),
+            'circuit': 'closed' if self.opened_at is None else 'open'
+        }
+
+
+def retry_after_seconds(error: FetchError) -> float or None:
+    value = error.headers.get('Retry-After') if error.headers else None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Fetcher:
+    '''
+    Concurrent page fetcher, cache first, with every download paced by one shared RateController.
+    base_url points it at a stand-in server, source serves pages from a PageArchive offline.
+    '''
+
+    def __init__(self,
+                 cache: PageCache = None,
+                 limiter: RateController = None,
+                 workers: int = FETCH_WORKERS,
+                 max_retries: int = FETCH_MAX_RETRIES,
+                 base_url: str = None,
+                 source=None,
+                 archive=None,
+                 session: HttpSession = None):
+        self.cache = cache
+        self.limiter = limiter or RateController()
+        self.max_retries = max_retries
+        self.base_url = base_url
+        self.source = source
+        self.archive = archive
+        self.session = session or HttpSession(maxsize=workers)
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._pending = {}
+        self._lock = threading.RLock()
+
+    def fetch(self, url: str, refresh: bool = False) -> bytes:
+        '''
+        Blocking fetch of a single page, cache first
+        '''
+        if not refresh:
+            html = self._cached(url)
+            if html is not None:
+                return html
+        with self._lock:
+            future = self._pending.get(url)
+        if future is not None and not refresh:  # already being downloaded by a worker
+            with TRACER.span('wait_pending', url=url):
+                return future.result()
+        return self._download(url)
+
+    def _cached(self, url: str) -> bytes or None:
+        if self.cache is None:
+            return None
+        with TRACER.span('cache', url=url) as span:
+            html = self.cache.get(url)
+            span['cache'] = 'miss' if html is None else 'hit'
+            span['bytes'] = len(html) if html is not None else 0
+        return html
+
+    def request_url(self, url: str) -> str:
+        if self.base_url is not None and url.startswith(PFR_BASE_URL):
+            return self.base_url + url[len(PFR_BASE_URL):]
+        return url
+
+    def _download(self, url: str, scraper: str = None) -> bytes:
+        with TRACER.bound(scraper), TRACER.span('download', url=url) as span:
+            if self.source is not None:
+                html = self.source.get(url)
+                if html is None:
+                    raise MissingPageError(f'{url} is not in the replay source')
+            else:
+                entry = self.cache.lookup(url) if self.cache is not None else None
+                validators = {key: entry.get(key) for key in ('etag', 'last_modified')} if entry else {}
+                response = self._request(url, span, **validators)
+                if response.status == 304:
+                    html = self.cache.get(url, stale=True)
+                    if html is not None:  # unchanged since cached
+                        span['cache'] = 'revalidated'
+                        span['bytes'] = len(html)
+                        self.cache.touch(url)
+                        return html
+                    response = self._request(url, span)
+                html = response.html
+                if self.archive is not None:
+                    self.archive.record(url, html)
+            span['bytes'] = len(html)
+            if self.cache is not None:
+                meta = {}
+                if self.source is None:
+                    meta = {
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified')
+                    }
+                with TRACER.span('cache_write', url=url, bytes=len(html)):
+                    self.cache.put(url, html, **meta)
+        return html
+
+    def _request(self, url: str, span: dict, **validators):
+        request_url = self.request_url(url)
+        retries = 0
+        while True:
+            with TRACER.span('rate_wait', url=url):
+                self.limiter.acquire()
+            try:
+                print(f'scraping {url}')
+                response = self.session.get(request_url, **validators)
+            except FetchError as e:
+                if e.status == 429:
+                    delay = self.limiter.throttled(retry_after_seconds(e))
+                elif e.status is None or e.status >= 500:
+                    delay = self.limiter.failure()
+                else:  # e.g. 404, retrying will not help
+                    self.limiter.success()
+                    raise
+                if retries >= self.max_retries:
+                    raise
+                retries += 1
+                span['retries'] = span.get('retries', 0) + 1
+                print(f'{e}, retrying in {delay:.1f}s')
+                if e.status != 429:  # a 429 pauses the controller for every caller instead
+                    with TRACER.span('backoff', url=url):
+                        time.sleep(delay)
+                continue
+            except Exception:
+                self.limiter.failure()
+                raise
+            self.limiter.success()
+            span['wire_bytes'] = span.get('wire_bytes', 0) + response.wire_bytes
+            return response
+
+    def submit(self, url: str, refresh: bool = False) -> Future:
+        '''
+        Queues a page fetch and returns a future for its html. Fresh cache hits resolve
+        immediately and duplicate submissions share the in-flight request.
+        '''
+        if not refresh:
+            html = self._cached(url)
+            if html is not None:
+                future = Future()
+                future.set_result(html)
+                return future
+        with self._lock:
+            future = self._pending.get(url)
+            if future is None:
+                future = self._executor.submit(self._download, url, TRACER.current_scraper())
+                self._pending[url] = future
+                future.add_done_callback(lambda f, url=url: self._done(url))
+        return future
+
+    def _done(self, url: str):
+        with self._lock:
+            self._pending.pop(url, None)
+
+    def fetch_many(self, urls: list, refresh: bool = False):
+        '''
+        Submits every url up front and yields (url, future) pairs in order
+        '''
+        futures = [(url, self.submit(url, refresh=refresh)) for url in urls]
+        for url, future in futures:
+            yield url, future
+
+    def prefetch(self, urls: list):
+        '''
+        Warms the page cache in the background without holding on to the results
+        '''
+        for url in urls:
+            self.submit(url)
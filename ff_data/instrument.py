@@ -0,0 +1,173 @@
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from cache import classify_url
+
+
+def count_rows(result) -> int:
+    '''
+    Rows in a scraper or parser result: a DataFrame, a list of records or a tuple of either
+    '''
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple):
+        return sum(count_rows(item) for item in result)
+    return 0
+
+
+class Tracer:
+    '''
+    Timed, per-thread nested spans of each scrape step, tagged with scraper and url class. Self time
+    excludes nested spans. Off until start(), spans can stream to a JSON-lines file.
+    '''
+
+    def __init__(self):
+        self.enabled = False
+        self.spans = []
+        self._file = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def start(self, path: str = None):
+        self.stop()
+        self.spans = []
+        self._file = open(path, 'w') if path is not None else None
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current_scraper(self) -> str or None:
+        for span in self._stack():
+            if span.get('scraper') is not None:
+                return span['scraper']
+        return getattr(self._local, 'scraper', None)
+
+    @contextmanager
+    def bound(self, scraper: str = None):
+        '''
+        Tags spans on this thread with a scraper captured on another thread, e.g. by a fetcher
+        worker downloading a page submitted from inside a scraper
+        '''
+        previous = getattr(self._local, 'scraper', None)
+        if scraper is not None:
+            self._local.scraper = scraper
+        try:
+            yield
+        finally:
+            self._local.scraper = previous
+
+    @contextmanager
+    def span(self, step: str, **fields):
+        '''
+        Times the enclosed block. Yields a dict the block can add fields to (bytes, rows, cache,
+        retries...); spans of a step already open on this thread are not recorded twice.
+        '''
+        stack = self._stack() if self.enabled else None
+        if stack is None or any(open_span['step'] == step for open_span in stack):
+            yield {}
+            return
+        span = {'step': step, 'scraper': self.current_scraper(), **fields, '_child_s': 0.}
+        stack.append(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except Exception as e:
+            span['error'] = repr(e)
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1]['_child_s'] += duration
+            self_s = duration - span.pop('_child_s')
+            self.record(span.pop('step'), duration, self_s=self_s, **span)
+
+    def record(self, step: str, duration: float, **fields):
+        if not self.enabled:
+            return
+        span = {'ts': time.time(), 'step': step, 'duration_s': duration, 'thread': threading.current_thread().name, **fields}
+        span.setdefault('self_s', duration)
+        span.setdefault('scraper', self.current_scraper())
+        if 'url' in span and 'url_class' not in span:
+            span['url_class'] = classify_url(span['url'])[0]
+        with self._lock:
+            self.spans.append(span)
+            if self._file is not None:
+                self._file.write(json.dumps(span, default=str) + '\n')
+                self._file.flush()
+
+    def summary(self) -> pd.DataFrame:
+        with self._lock:
+            return summarize(pd.DataFrame(self.spans))
+
+
+def load_trace(path: str) -> pd.DataFrame:
+    return pd.read_json(path, lines=True)
+
+
+def summarize(spans: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Per (scraper, step, url class) totals of a trace, most expensive self time first
+    '''
+    if spans.empty:
+        return pd.DataFrame()
+    spans = spans.copy()
+    for col in ('scraper', 'url_class'):
+        spans[col] = spans[col].fillna('-') if col in spans else '-'
+    for col in ('bytes', 'rows', 'retries'):
+        spans[col] = spans[col].fillna(0) if col in spans else 0
+    spans['cache_hit'] = spans['cache'].eq('hit') if 'cache' in spans else False
+    spans['cache_miss'] = spans['cache'].eq('miss') if 'cache' in spans else False
+    grouped = spans.groupby(['scraper', 'step', 'url_class'])
+    summary = pd.DataFrame({
+        'count': grouped.size(),
+        'total_s': grouped.duration_s.sum(),
+        'self_s': grouped.self_s.sum(),
+        'mean_ms': grouped.duration_s.mean() * 1000,
+        'p90_ms': grouped.duration_s.quantile(0.9) * 1000,
+        'bytes': grouped.bytes.sum(),
+        'rows': grouped.rows.sum(),
+        'cache_hits': grouped.cache_hit.sum(),
+        'cache_misses': grouped.cache_miss.sum(),
+        'retries': grouped.retries.sum()
+    })
+    summary['self_pct'] = 100 * summary.self_s / summary.self_s.sum() if summary.self_s.sum() else np.nan
+    return summary.sort_values('self_s', ascending=False)
+
+
+TRACER = Tracer()
+
+
+def traced(func):
+    '''
+    Records a scrape span for each call of a scraper function, tagged with its name and the rows
+    it returned
+    '''
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not TRACER.enabled:
+            return func(*args, **kwargs)
+        with TRACER.span('scrape', scraper=func.__name__) as span:
+            result = func(*args, **kwargs)
+            span['rows'] = count_rows(result)
+        return result
+
+    return wrapper
@@ -0,0 +1,189 @@
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+from constants import SCRAPE_LEASE, SCRAPE_MAX_ATTEMPTS
+
+JOURNAL_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS units (
+    team TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    stage TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    output TEXT,
+    owner TEXT,
+    claimed_at REAL,
+    updated_at REAL,
+    PRIMARY KEY (team, year, stage)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+'''
+
+
+class ScrapeJournal:
+    '''
+    SQLite journal of (team, year, stage) scrape units with checkpointed outputs, so a restarted
+    scrape skips done units. Doubles as a work queue, see claim(), that leases units to workers.
+    '''
+
+    def __init__(self, scrape_dir: str, mode: str = None, max_attempts: int = SCRAPE_MAX_ATTEMPTS,
+                 lease: float = SCRAPE_LEASE):
+        os.makedirs(scrape_dir, exist_ok=True)
+        self.scrape_dir = scrape_dir
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self._conn = sqlite3.connect(os.path.join(scrape_dir, 'journal.sqlite'), timeout=60, isolation_level=None)
+        self._conn.executescript(JOURNAL_SCHEMA)
+        if mode is not None:
+            self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('mode', ?)", (mode,))
+            journal_mode = self._conn.execute("SELECT value FROM meta WHERE key = 'mode'").fetchone()[0]
+            if journal_mode != mode:
+                raise ValueError(f'{scrape_dir} holds a {journal_mode} scrape, not a {mode} one, use a scrape_dir of its own')
+
+    def add(self, units: list):
+        '''
+        Registers (team, year, stage) units, units already in the journal keep their status
+        '''
+        self._conn.executemany('INSERT OR IGNORE INTO units (team, year, stage) VALUES (?, ?, ?)', units)
+
+    def status(self, team: str, year: int, stage: str) -> str or None:
+        row = self._conn.execute(
+            'SELECT status FROM units WHERE team = ? AND year = ? AND stage = ?', (team, year, stage)
+        ).fetchone()
+        return row[0] if row else None
+
+    def is_runnable(self, team: str, year: int, stage: str) -> bool:
+        row = self._conn.execute(
+            'SELECT status, attempts FROM units WHERE team = ? AND year = ? AND stage = ?', (team, year, stage)
+        ).fetchone()
+        if row is None:
+            return True
+        status, attempts = row
+        # units left 'running' by a crashed scrape are picked up again
+        return status in ('pending', 'running') or (status == 'failed' and attempts < self.max_attempts)
+
+    def _set(self, team: str, year: int, stage: str, **values):
+        values['updated_at'] = time.time()
+        assignments = ', '.join(f'{key} = ?' for key in values)
+        self._conn.execute(
+            f'UPDATE units SET {assignments} WHERE team = ? AND year = ? AND stage = ?',
+            (*values.values(), team, year, stage)
+        )
+
+    def run(self, team: str, year: int, stage: str, scrape) -> dict or None:
+        '''
+        Runs a unit's scrape function unless it is already done. The returned dict of DataFrames
+        is checkpointed and the unit marked done; exceptions mark the unit failed and return None.
+        '''
+        if not self.is_runnable(team, year, stage):
+            return None
+        self.add([(team, year, stage)])
+        self._conn.execute(
+            'UPDATE units SET status = ?, attempts = attempts + 1, updated_at = ? WHERE team = ? AND year = ? AND stage = ?',
+            ('running', time.time(), team, year, stage)
+        )
+        return self.execute(team, year, stage, scrape)
+
+    def claim(self, owner: str, stages: list = None) -> tuple or None:
+        '''
+        Atomically takes the next runnable (team, year, stage) unit for a worker, or None if
+        there is none right now
+        '''
+        now = time.time()
+        query = (
+            "SELECT team, year, stage FROM units WHERE (status = 'pending' OR (status = 'failed' AND attempts < ?) "
+            "OR (status = 'running' AND (claimed_at IS NULL OR claimed_at < ?)))"
+        )
+        params = [self.max_attempts, now - self.lease]
+        if stages is not None:
+            query += f" AND stage IN ({', '.join('?' * len(stages))})"
+            params += stages
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            unit = self._conn.execute(query + ' ORDER BY rowid LIMIT 1', params).fetchone()
+            if unit is not None:
+                self._conn.execute(
+                    "UPDATE units SET status = 'running', attempts = attempts + 1, owner = ?, claimed_at = ?, updated_at = ? "
+                    'WHERE team = ? AND year = ? AND stage = ?',
+                    (owner, now, now, *unit)
+                )
+            self._conn.execute('COMMIT')
+        except BaseException:
+            self._conn.execute('ROLLBACK')
+            raise
+        return unit
+
+    def in_progress(self) -> int:
+        '''
+        Units still pending, claimed by a worker or due for another attempt
+        '''
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM units WHERE status IN ('pending', 'running') OR (status = 'failed' AND attempts < ?)",
+            (self.max_attempts,)
+        ).fetchone()[0]
+
+    def execute(self, team: str, year: int, stage: str, scrape) -> dict or None:
+        '''
+        Runs the scrape function of a unit already marked running (see run and claim) and
+        checkpoints its output
+        '''
+        try:
+            tables = scrape()
+        except Exception as e:
+            print(f'{stage} failed | team = {team} | year = {year} | {e!r}')
+            self._set(team, year, stage, status='failed', error=repr(e))
+            return None
+        output = os.path.join(self.scrape_dir, stage, f'{team}_{year}.pkl')
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        pd.to_pickle(tables, f'{output}.tmp')
+        os.replace(f'{output}.tmp', output)
+        self._set(team, year, stage, status='done', error=None, output=output)
+        return tables
+
+    def retry_failed(self, stage: str = None):
+        '''
+        Resets failed units (optionally of one stage) so the next scrape runs them again
+        '''
+        query = "UPDATE units SET status = 'pending', attempts = 0 WHERE status = 'failed'"
+        params = ()
+        if stage is not None:
+            query += ' AND stage = ?'
+            params = (stage,)
+        self._conn.execute(query, params)
+
+    def failed(self) -> pd.DataFrame:
+        return pd.read_sql_query(
+            "SELECT team, year, stage, attempts, error FROM units WHERE status = 'failed' ORDER BY rowid", self._conn
+        )
+
+    def summary(self) -> pd.DataFrame:
+        return pd.read_sql_query(
+            'SELECT stage, status, COUNT(*) AS units FROM units GROUP BY stage, status ORDER BY stage, status', self._conn
+        )
+
+    def outputs(self, stages: list = None):
+        '''
+        Yields the checkpointed table dicts of done units in journal order
+        '''
+        rows = self._conn.execute("SELECT stage, output FROM units WHERE status = 'done' ORDER BY rowid").fetchall()
+        for stage, output in rows:
+            if stages is None or stage in stages:
+                yield pd.read_pickle(output)
+
+    def load(self, table_cols: dict, stages: list = None) -> dict:
+        '''
+        Concatenates checkpointed outputs into one DataFrame per table name
+        '''
+        chunks = {name: [pd.DataFrame(columns=cols)] for name, cols in table_cols.items()}
+        for tables in self.outputs(stages):
+            for name, df in tables.items():
+                if name in chunks:
+                    chunks[name].append(df)
+        return {name: pd.concat(dfs, ignore_index=True) for name, dfs in chunks.items()}
@@ -0,0 +1,184 @@
+import fcntl
+import os
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from storage import read_frame, stored_format, table_path, write_frame
+
+# string id column -> (key namespace, integer key column). 'id' is the players table's own PFR
+# id, which stays in place for display when the other string id columns are dropped.
+KEY_COLUMNS = {
+    'id': ('player', 'player_key'),
+    'player': ('player', 'player_key'),
+    'team': ('team', 'team_key'),
+    'opp': ('team', 'opp_key'),
+    'coach': ('coach', 'coach_key')
+}
+
+# integer key column -> (key namespace, string id column)
+ID_COLUMNS = {key_col: (kind, col) for col, (kind, key_col) in KEY_COLUMNS.items() if col != 'id'}
+
+KEY_DTYPES = {
+    'player': 'int32',
+    'team': 'int16',
+    'coach': 'int16'
+}
+
+# key of a missing string id, and of ids that have not been given a key yet
+MISSING_KEY = -1
+
+# lock file serializing writers that hand out new keys
+KEYS_LOCK = 'keys.lock'
+
+
+class KeyMap:
+    '''
+    Stable integer surrogate keys for one namespace of string ids (players, teams or coaches).
+    Keys are handed out in first-seen order and never reassigned, and the map is stored as a
+    small dimension table next to the FFData tables, so a key means the same id across tables
+    and runs and joins and filters can compare integer arrays instead of strings.
+    '''
+
+    def __init__(self, kind: str, values: list = ()):
+        self.kind = kind
+        self.dtype = KEY_DTYPES[kind]
+        self.changed = False
+        self._values = list(values)
+        self._index = pd.Index(self._values, dtype=object)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, value: str) -> bool:
+        return value in self._index
+
+    def encode(self, values, add: bool = False) -> np.ndarray:
+        '''
+        Keys of an array of string ids, unseen ids are MISSING_KEY (like missing ids) unless
+        add=True gives them new keys, which only writers holding locked_keymaps() may do
+        '''
+        values = pd.Series(values, dtype=object)
+        codes = self._index.get_indexer(values)
+        if add and (codes == MISSING_KEY).any():
+            new_values = pd.unique(values[(codes == MISSING_KEY) & values.notna().to_numpy()])
+            if len(new_values):
+                self._values.extend(new_values)
+                self._index = pd.Index(self._values, dtype=object)
+                self.changed = True
+                codes = self._index.get_indexer(values)
+        return codes.astype(self.dtype)
+
+    def decode(self, keys) -> np.ndarray:
+        '''
+        String ids of an array of keys, None for MISSING_KEY
+        '''
+        keys = np.asarray(keys)
+        values = np.append(np.asarray(self._values, dtype=object), None)
+        return values[np.where(keys == MISSING_KEY, len(self._values), keys)]
+
+    def key(self, value: str) -> int:
+        return int(self._index.get_loc(value))
+
+    def value(self, key: int) -> str:
+        return self._values[key]
+
+    def frame(self) -> pd.DataFrame:
+        '''
+        The dimension table, key -> string id
+        '''
+        return pd.DataFrame({
+            'key': np.arange(len(self._values), dtype=self.dtype),
+            'value': pd.Series(self._values, dtype=object)
+        })
+
+    @classmethod
+    def load(cls, data_dir: str, kind: str) -> 'KeyMap':
+        file = f'{kind}_keys.csv'
+        format = stored_format(data_dir, file)
+        if format is None:
+            return cls(kind)
+        df = read_frame(table_path(data_dir, file, format), format, index=False)
+        return cls(kind, df.sort_values('key').value.tolist())
+
+    def save(self, data_dir: str, format: str = 'csv'):
+        write_frame(self.frame(), table_path(data_dir, f'{self.kind}_keys.csv', format), format, index=False)
+        self.changed = False
+
+
+def load_keymaps(data_dir: str) -> dict:
+    return {kind: KeyMap.load(data_dir, kind) for kind in KEY_DTYPES}
+
+
+def save_keymaps(data_dir: str, keymaps: dict, format: str = 'csv'):
+    '''
+    Stores the keymaps that handed out new keys
+    '''
+    os.makedirs(data_dir, exist_ok=True)
+    for keymap in keymaps.values():
+        if keymap.changed:
+            keymap.save(data_dir, format)
+
+
+@contextmanager
+def locked_keymaps(data_dir: str):
+    '''
+    Keymaps for handing out new keys. They are loaded under an exclusive lock on the data
+    directory and stored before it is released, so writers in different processes always extend
+    the latest maps and never give one key to two ids. Readers only need load_keymaps().
+    '''
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, KEYS_LOCK), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            keymaps = load_keymaps(data_dir)
+            yield keymaps
+            save_keymaps(data_dir, keymaps)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def encode_keys(df: pd.DataFrame, keymaps: dict, drop: bool = False, add: bool = False) -> pd.DataFrame:
+    '''
+    Adds the integer key column of every string id column of df, drop=True replaces the string
+    columns by their keys instead (except the players table's own id). add=True gives unseen ids
+    new keys, see KeyMap.encode.
+    '''
+    df = df.copy(deep=False)
+    for col in [col for col in df.columns if col in KEY_COLUMNS]:
+        kind, key_col = KEY_COLUMNS[col]
+        keys = keymaps[kind].encode(df[col], add)
+        if key_col in df:
+            del df[key_col]
+        if drop and col != 'id':
+            df.insert(df.columns.get_loc(col), key_col, keys)
+            del df[col]
+        else:
+            df[key_col] = keys
+    return df
+
+
+def add_keys(df: pd.DataFrame, keymaps: dict):
+    '''
+    Gives every id in the string id columns of df that has no key yet a new key
+    '''
+    for col in [col for col in df.columns if col in KEY_COLUMNS]:
+        keymaps[KEY_COLUMNS[col][0]].encode(df[col], add=True)
+
+
+def has_keys(df: pd.DataFrame) -> bool:
+    return any(col in ID_COLUMNS for col in df.columns)
+
+
+def decode_keys(df: pd.DataFrame, keymaps: dict) -> pd.DataFrame:
+    '''
+    Inverse of encode_keys(drop=True), puts the string id columns back in place of their keys
+    '''
+    df = df.copy(deep=False)
+    for key_col in [col for col in df.columns if col in ID_COLUMNS]:
+        kind, col = ID_COLUMNS[key_col]
+        if col not in df and not (kind == 'player' and 'id' in df):
+            df.insert(df.columns.get_loc(key_col), col, keymaps[kind].decode(df[key_col]))
+        del df[key_col]
+    return df
@@ -0,0 +1,229 @@
+import multiprocessing
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import numpy as np
+from bs4 import BeautifulSoup, Comment
+
+from constants import PARSE_WORKERS
+from instrument import TRACER, count_rows
+
+
+class ParsePool:
+    '''
+    Process pool for CPU-bound page parsing. Parsers are top-level functions that take raw html
+    bytes plus context args and return row records (or small DataFrames), so pages are parsed on
+    every core while the fetcher keeps downloading. workers=0 parses inline on the caller.
+    '''
+
+    def __init__(self, workers: int = PARSE_WORKERS):
+        self.workers = os.cpu_count() if workers is None else workers
+        self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn so workers never inherit locks held by the fetcher threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+
+    def submit(self, parser, html: bytes, *args) -> Future:
+        if self.workers == 0:
+            future = Future()
+            try:
+                with TRACER.span('parse', parser=parser.__name__, bytes=len(html)) as span:
+                    result = parser(html, *args)
+                    span['rows'] = count_rows(result)
+                future.set_result(result)
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        if not TRACER.enabled:
+            return self._get_executor().submit(parser, html, *args)
+        # worker processes have no tracer, so the parse is timed there and recorded here
+        future = Future()
+        scraper = TRACER.current_scraper()
+        self._get_executor().submit(_timed_parse, parser, html, *args).add_done_callback(
+            lambda f: _record_parse(f, future, parser.__name__, len(html), scraper)
+        )
+        return future
+
+    def submit_fetched(self, fetch_future: Future, parser, *args) -> Future:
+        '''
+        Chains a parse onto a pending fetch, the page is queued for parsing as soon as it arrives
+        '''
+        future = Future()
+        scraper = TRACER.current_scraper()
+
+        def _parse(f):
+            try:
+                html = f.result()
+            except Exception as e:
+                future.set_exception(e)
+                return
+            with TRACER.bound(scraper):
+                self.submit(parser, html, *args).add_done_callback(lambda p: _chain(p, future))
+
+        fetch_future.add_done_callback(_parse)
+        return future
+
+    def imap(self, parser, jobs, window: int = None):
+        '''
+        Parses an iterable of (html, *args) jobs, keeping at most `window` pages in flight so
+        large archives stream through in bounded memory. Results are yielded in job order.
+        '''
+        window = window or max(1, self.workers) * 4
+        pending = deque()
+        for job in jobs:
+            pending.append(self.submit(parser, *job))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def _timed_parse(parser, html: bytes, *args) -> tuple:
+    start = time.perf_counter()
+    result = parser(html, *args)
+    return result, time.perf_counter() - start
+
+
+def _record_parse(source: Future, target: Future, parser: str, size: int, scraper: str):
+    try:
+        result, duration = source.result()
+    except Exception as e:
+        target.set_exception(e)
+        return
+    TRACER.record('parse', duration, parser=parser, bytes=size, rows=count_rows(result), scraper=scraper)
+    target.set_result(result)
+
+
+def _chain(source: Future, target: Future):
+    try:
+        target.set_result(source.result())
+    except Exception as e:
+        target.set_exception(e)
+
+
+def extract_tables(html: bytes, table_ids: list) -> bytes:
+    '''
+    Slices the requested <table> elements out of raw page html. This is a plain byte scan, so
+    tables PFR ships inside HTML comments are found just like visible ones, and the result is a
+    small document holding only those tables.
+    '''
+    fragments = []
+    for table_id in table_ids:
+        match = re.search(rb'<table[^>]*\sid="' + re.escape(table_id.encode('utf-8')) + rb'"', html)
+        if match is None:
+            continue
+        end = html.find(b'</table>', match.end())
+        if end == -1:
+            continue
+        fragments.append(html[match.start():end + len(b'</table>')])
+    return b'<html><body>' + b''.join(fragments) + b'</body></html>'
+
+
+def make_soup(html: bytes, tables: list = None) -> BeautifulSoup:
+    '''
+    Parses page html, materializing only the given table ids when `tables` is set
+    '''
+    with TRACER.span('parse', bytes=len(html)):
+        if tables is not None:
+            html = extract_tables(html, tables)
+        return BeautifulSoup(html, features="lxml")
+
+
+# div ids defined in a comment, mentions of an id elsewhere in a comment do not count
+COMMENT_DIV_ID = re.compile(r'\bid=["\'](div_[^"\']+)["\']')
+
+
+class CommentIndex:
+    '''
+    Index of the html comments PFR hides tables in, keyed by the div_* ids they define. The page is
+    scanned for comments once, and each hidden section is parsed lazily and at most once.
+    '''
+
+    def __init__(self, soup: BeautifulSoup):
+        self._comments = {}
+        self._soups = {}
+        for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
+            for div_id in COMMENT_DIV_ID.findall(comment):
+                self._comments.setdefault(div_id, comment)
+
+    def comment(self, div_id: str) -> str or None:
+        return self._comments.get(div_id)
+
+    def soup(self, div_id: str) -> BeautifulSoup or None:
+        if div_id not in self._soups:
+            comment = self._comments.get(div_id)
+            self._soups[div_id] = BeautifulSoup(comment, features="lxml") if comment is not None else None
+        return self._soups[div_id]
+
+
+class Col:
+    '''
+    Declarative spec for one output column read from a PFR data-stat cell. The raw value is the
+    cell text, an attribute (e.g. csk) or a segment of the cell link href; blank values fall back
+    to `blank` and missing cells or unconvertible values to `default`.
+    '''
+
+    def __init__(self, stat: str, convert=str, default=np.nan, blank=None, attr: str = None, href: int = None):
+        self.stat = stat
+        self.convert = convert
+        self.default = default
+        self.blank = default if blank is None else blank
+        self.attr = attr
+        self.href = href
+
+    def extract(self, cells: dict):
+        cell = cells.get(self.stat)
+        if cell is None:
+            return self.default
+        if self.attr is not None:
+            raw = cell.get(self.attr)
+        elif self.href is not None:
+            link = cell.a
+            if link is None:
+                return self.default
+            try:
+                raw = link['href'].split('/')[self.href]
+            except (KeyError, IndexError):
+                return self.default
+        else:
+            raw = cell.get_text()
+        if raw is None:
+            return self.default
+        if raw == '':
+            return self.blank
+        try:
+            return self.convert(raw)
+        except (ValueError, TypeError, IndexError):
+            return self.default
+
+
+def row_cells(row) -> dict:
+    '''
+    Maps data-stat -> cell for a table row in a single walk over its direct children
+    '''
+    cells = {}
+    for cell in row.children:
+        if cell.name is None:
+            continue
+        stat = cell.get('data-stat')
+        if stat is not None and stat not in cells:
+            cells[stat] = cell
+    return cells
+
+
+def extract_row(cells: dict, spec: dict) -> dict:
+    return {col: col_spec.extract(cells) for col, col_spec in spec.items()}
@@ -0,0 +1,72 @@
+import glob
+import os
+
+import pandas as pd
+from pandas.api.types import infer_dtype
+
+PARTITION_FORMATS = {
+    'parquet': ('parquet', lambda df, path: df.to_parquet(path, index=False), pd.read_parquet),
+    'feather': ('feather', lambda df, path: df.to_feather(path), pd.read_feather)
+}
+
+# inferred object column types Arrow can convert as they are
+ARROW_INFERRED_TYPES = ['string', 'empty', 'boolean', 'integer', 'floating', 'mixed-integer-float', 'date', 'datetime']
+
+
+def arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Scraped object columns can mix types (e.g. week_num is text when freshly scraped), which
+    Arrow cannot store, so mixed columns are written as strings
+    '''
+    df = df.reset_index(drop=True)
+    for col in df.columns:
+        if df[col].dtype == object and infer_dtype(df[col], skipna=True) not in ARROW_INFERRED_TYPES:
+            df[col] = df[col].map(lambda value: value if pd.isna(value) else str(value))
+    return df
+
+
+class PartitionWriter:
+    '''
+    Writes scrape output tables as they are produced, one file per table and (team, year) unit
+    under {root}/{table}/year={year}/team={team}/. Files are written to a temp name and moved into
+    place, so readers can load completed partitions while the scrape is still running.
+    '''
+
+    def __init__(self, root: str, format: str = 'parquet'):
+        self.root = root
+        self.ext, self._write, _ = PARTITION_FORMATS[format]
+
+    def path(self, table: str, team: str, year: int) -> str:
+        return os.path.join(self.root, table, f'year={year}', f'team={team}', f'part.{self.ext}')
+
+    def write(self, table: str, df: pd.DataFrame, team: str, year: int, keep_empty: bool = False):
+        '''
+        Writes a partition, tables without rows are skipped unless keep_empty, e.g. to record that
+        a unit was scraped and had no rows
+        '''
+        if df.empty and not keep_empty:
+            return
+        path = self.path(table, team, year)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._write(arrow_safe(df), f'{path}.tmp')
+        os.replace(f'{path}.tmp', path)
+
+    def write_unit(self, team: str, year: int, tables: dict):
+        for table, df in tables.items():
+            self.write(table, df, team, year)
+
+
+def read_partitions(root: str, table: str, cols: list = None, format: str = 'parquet', years: list = None, teams: list = None) -> pd.DataFrame:
+    '''
+    Concatenates the completed partitions of a table, optionally only those of some years or teams
+    '''
+    ext, _, read = PARTITION_FORMATS[format]
+    dfs = [pd.DataFrame(columns=cols)] if cols is not None else []
+    for path in sorted(glob.glob(os.path.join(root, table, 'year=*', 'team=*', f'part.{ext}'))):
+        year = int(os.path.basename(os.path.dirname(os.path.dirname(path)))[len('year='):])
+        team = os.path.basename(os.path.dirname(path))[len('team='):]
+        if (years is None or year in years) and (teams is None or team in teams):
+            dfs.append(read(path))
+    if not dfs:
+        return pd.DataFrame()
+    return pd.concat(dfs, ignore_index=True)
@@ -0,0 +1,186 @@
+import gzip
+import hashlib
+import random
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cache import PageCache, url_key
+from constants import PFR_BASE_URL
+
+
+class PageArchive:
+    '''
+    Zip archive of recorded PFR pages for offline replay. Each page is a deflated entry named by
+    its url key with the original url stored as the entry comment, so the archive is self
+    describing and can be appended to while a scrape records into it.
+    '''
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._zip = zipfile.ZipFile(path, 'a', compression=zipfile.ZIP_DEFLATED)
+        self._names = {info.comment.decode('utf-8'): info.filename for info in self._zip.infolist()}
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._names
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def urls(self) -> list:
+        return list(self._names)
+
+    def get(self, url: str) -> bytes or None:
+        name = self._names.get(url)
+        if name is None:
+            return None
+        with self._lock:
+            return self._zip.read(name)
+
+    def record(self, url: str, html: bytes):
+        '''
+        Adds a page, pages already in the archive keep their first recording
+        '''
+        with self._lock:
+            if url in self._names:
+                return
+            info = zipfile.ZipInfo(f'{url_key(url)}.html', date_time=time.localtime()[:6])
+            info.comment = url.encode('utf-8')
+            info.compress_type = zipfile.ZIP_DEFLATED
+            self._zip.writestr(info, html)
+            self._names[url] = info.filename
+
+    def record_cache(self, cache: PageCache, url_class: str = None) -> int:
+        '''
+        Copies pages from the page cache, optionally only one url class, and returns the count
+        '''
+        count = 0
+        for entry in cache.entries(url_class):
+            html = cache.get(entry['url'], stale=True)
+            if html is not None and entry['url'] not in self:
+                self.record(entry['url'], html)
+                count += 1
+        return count
+
+    def close(self):
+        with self._lock:
+            self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ReplayServer:
+    '''
+    Local stand-in for pro-football-reference.com serving pages from a PageArchive. Responses
+    can be delayed, throttled with 429s or failed with 503s at random, so fetch concurrency,
+    retries and parse throughput can be measured reproducibly without network access. Like PFR
+    it sends ETags, answers matching conditional requests with 304 and gzips pages for clients
+    that accept it. Point a Fetcher at it with base_url=server.url.
+    '''
+
+    def __init__(self,
+                 archive: PageArchive,
+                 latency: float = 0,
+                 jitter: float = 0,
+                 throttle_rate: float = 0,
+                 error_rate: float = 0,
+                 retry_after: int = 1,
+                 compress: bool = True,
+                 seed: int = None,
+                 host: str = '127.0.0.1',
+                 port: int = 0):
+        self.archive = archive
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.compress = compress
+        self.stats = {'requests': 0, 'served': 0, 'not_modified': 0, 'throttled': 0, 'failed': 0, 'missing': 0, 'wire_bytes': 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, every response has a Content-Length
+
+            def do_GET(self):
+                status, headers, body = server.respond(self.path, self.headers)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def respond(self, path: str, request_headers: dict = None) -> tuple:
+        '''
+        Returns (status, headers, body) for a request path and headers
+        '''
+        request_headers = request_headers or {}
+        with self._lock:
+            self.stats['requests'] += 1
+            roll = self._random.random()
+            delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        if roll < self.throttle_rate:
+            return self._count('throttled', 429, {'Retry-After': str(self.retry_after)}, b'Too Many Requests')
+        if roll < self.throttle_rate + self.error_rate:
+            return self._count('failed', 503, {}, b'Service Unavailable')
+        html = self.archive.get(PFR_BASE_URL + path)
+        if html is None:
+            return self._count('missing', 404, {}, b'Not Found')
+        etag = '"' + hashlib.sha1(html).hexdigest() + '"'
+        if request_headers.get('If-None-Match') == etag:
+            return self._count('not_modified', 304, {'ETag': etag}, b'')
+        headers = {'Content-Type': 'text/html; charset=utf-8', 'ETag': etag}
+        if self.compress and 'gzip' in request_headers.get('Accept-Encoding', ''):
+            html = gzip.compress(html)
+            headers['Content-Encoding'] = 'gzip'
+        return self._count('served', 200, headers, html)
+
+    def _count(self, stat: str, status: int, headers: dict, body: bytes) -> tuple:
+        with self._lock:
+            self.stats[stat] += 1
+            self.stats['wire_bytes'] += len(body)
+        return status, headers, body
+
+    def start(self) -> 'ReplayServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
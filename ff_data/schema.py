@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+# smallest dtype that holds every value of a scraped column, by column name. Integer columns
+# fall back to the nullable dtype of the same width (int8 -> Int8) when values are missing,
+# and are widened when a value is out of range, and bool columns fall back to 'boolean'.
+# Decimals stay float64 so stored values read back exactly as scraped. Player and coach ids stay strings, team and position style
+# codes with few distinct values become categories; FFData can swap both for integer keys.
+COLUMN_DTYPES = {
+    # ids and codes
+    'id': 'object',
+    'player': 'object',
+    'coach': 'object',
+    'team': 'category',
+    'opp': 'category',
+    'position': 'category',
+    'result': 'category',
+    'dnp_reason': 'category',
+    'txn_type': 'category',
+    'award_type': 'category',
+    'role': 'category',
+    # integer surrogate keys, see keys.py
+    'player_key': 'int32',
+    'team_key': 'int16',
+    'opp_key': 'int16',
+    'coach_key': 'int16',
+    # dates
+    'date': 'datetime64[ns]',
+    'dob': 'datetime64[ns]',
+    # calendar
+    'year': 'int16',
+    'season_num': 'int8',
+    'game_num': 'int8',
+    'week_num': 'int8',
+    'start_game_num': 'int8',
+    'end_game_num': 'int8',
+    # flags
+    'home': 'bool',
+    'active': 'bool',
+    'start': 'bool',
+    'win': 'bool',
+    # player profile
+    'height': 'int8',
+    'weight': 'int16',
+    'age': 'int8',
+    'av': 'int8',
+    'pro_relatives': 'int8',
+    'forty': 'float64',
+    'bench': 'int8',
+    'broad_jump': 'int16',
+    'shuttle': 'float64',
+    'cone': 'float64',
+    'vertical': 'float64',
+    # draft and awards
+    'round': 'int8',
+    'pick': 'int16',
+    'vote_share': 'float64',
+    # team seasons
+    'win_pct': 'float64',
+    'proj_win_pct': 'float64',
+    'proj_sb_odds': 'float64',
+    # game stats
+    'team_score': 'int8',
+    'opp_score': 'int8',
+    'pass_comp': 'int16',
+    'pass_att': 'int16',
+    'pass_yd': 'int16',
+    'pass_td': 'int8',
+    'pass_int': 'int8',
+    'qb_rate': 'float64',
+    'sack': 'int8',
+    'rush_att': 'int16',
+    'rush_yd': 'int16',
+    'rush_td': 'int8',
+    'rec': 'int8',
+    'rec_tgt': 'int8',
+    'rec_yd': 'int16',
+    'rec_td': 'int8',
+    'team_top': 'int16',
+    'opp_top': 'int16',
+    'fourth_down_att': 'int8',
+    'fourth_down_conv': 'int8',
+    'third_down_att': 'int8',
+    'third_down_conv': 'int8'
+}
+
+# text forms of booleans, e.g. a bool column with missing values read back from csv
+BOOL_VALUES = {True: True, False: False, 'True': True, 'False': False, 1: True, 0: False}
+
+
+def table_schema(cols: list) -> dict:
+    '''
+    Column -> dtype for the columns of a table, every column must be in COLUMN_DTYPES
+    '''
+    missing = [col for col in cols if col not in COLUMN_DTYPES]
+    if missing:
+        raise KeyError(f'no dtype for columns {missing}')
+    return {col: COLUMN_DTYPES[col] for col in cols}
+
+
+def int_dtype(values: pd.Series, dtype: str) -> str:
+    '''
+    The narrowest integer dtype no narrower than dtype that holds the values, astype() would
+    wrap out of range values around (300 -> 44 as int8)
+    '''
+    if values.isna().all():
+        return dtype
+    low, high = values.min(), values.max()
+    for wider in ['int8', 'int16', 'int32', 'int64']:
+        info = np.iinfo(wider)
+        if info.bits >= np.iinfo(dtype).bits and info.min <= low and high <= info.max:
+            return wider
+    raise OverflowError(f'values {low} to {high} do not fit in int64')
+
+
+def cast_column(series: pd.Series, dtype: str) -> pd.Series:
+    if dtype == 'object':
+        return series
+    if dtype == 'category':
+        return series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype('category')
+    if dtype == 'datetime64[ns]':
+        if series.dtype == dtype:
+            return series
+        values = series if series.dtype.kind == 'M' else pd.to_datetime(series, errors='coerce')
+        return values.astype(dtype)
+    if dtype == 'bool':
+        if series.dtype == bool:
+            return series
+        values = series.map(BOOL_VALUES)
+        return values.astype('boolean') if values.isna().any() else values.astype(bool)
+    if series.dtype == dtype:
+        return series
+    values = pd.to_numeric(series, errors='coerce')
+    if np.issubdtype(np.dtype(dtype), np.integer):
+        dtype = int_dtype(values, dtype)
+        if values.isna().any():
+            return values.astype(dtype.capitalize())
+    return values.astype(dtype)
+
+
+def apply_schema(df: pd.DataFrame, schema: dict = None) -> pd.DataFrame:
+    '''
+    Casts the columns of df that are in the schema (COLUMN_DTYPES by default) to their dtypes,
+    columns that already have them are left as they are
+    '''
+    schema = COLUMN_DTYPES if schema is None else schema
+    df = df.copy(deep=False)
+    for col in df.columns:
+        if col in schema:
+            series = df[col]
+            values = cast_column(series, schema[col])
+            # assigning copies the column, which would also unmap memory-mapped columns
+            if values is not series:
+                df[col] = values
+    return df
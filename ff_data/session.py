@@ -0,0 +1,66 @@
+from collections import namedtuple
+
+import urllib3
+
+from constants import FETCH_WORKERS, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT
+
+# status 304 responses carry html=None; wire_bytes is the (possibly compressed) size on the wire
+Response = namedtuple('Response', ['status', 'html', 'headers', 'wire_bytes'])
+
+
+class FetchError(OSError):
+    '''
+    Failed request, keeps the status and headers (e.g. Retry-After) for the caller. status is
+    None when no response came back at all (connection error or timeout).
+    '''
+
+    def __init__(self, url: str, status: int = None, headers=None, reason: str = None):
+        super().__init__(f'{status or reason} {url}')
+        self.url = url
+        self.status = status
+        self.headers = headers or {}
+
+
+class HttpSession:
+    '''
+    Pooled keep-alive HTTP client shared by every fetch. Connections are reused across requests
+    instead of paying a TCP+TLS handshake per page, responses are requested gzip (and brotli,
+    when a brotli module is installed) compressed, and conditional requests let an unchanged
+    page come back as a body-less 304.
+    '''
+
+    def __init__(self,
+                 maxsize: int = FETCH_WORKERS,
+                 connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+                 read_timeout: float = HTTP_READ_TIMEOUT,
+                 headers: dict = None):
+        self.headers = {**urllib3.util.make_headers(keep_alive=True, accept_encoding=True), **(headers or {})}
+        self._pool = urllib3.PoolManager(
+            maxsize=maxsize,
+            timeout=urllib3.Timeout(connect=connect_timeout, read=read_timeout),
+            retries=False
+        )
+
+    def get(self, url: str, etag: str = None, last_modified: str = None) -> Response:
+        headers = dict(self.headers)
+        if etag is not None:
+            headers['If-None-Match'] = etag
+        if last_modified is not None:
+            headers['If-Modified-Since'] = last_modified
+        try:
+            response = self._pool.request('GET', url, headers=headers, preload_content=False)
+            try:
+                html = response.read(decode_content=True)
+                wire_bytes = response.tell()
+            finally:
+                response.release_conn()
+        except urllib3.exceptions.HTTPError as e:
+            raise FetchError(url, reason=repr(e)) from e
+        if response.status == 304:
+            return Response(304, None, response.headers, wire_bytes)
+        if response.status >= 400:
+            raise FetchError(url, response.status, response.headers)
+        return Response(response.status, html, response.headers, wire_bytes)
+
+    def clear(self):
+        self._pool.clear()
@@ -0,0 +1,70 @@
+import os
+
+import pandas as pd
+from pyarrow import feather
+
+from partitions import arrow_safe
+
+# formats FFData tables can be stored in, in order of preference when several are present;
+# parquet and feather are read without parsing text and keep their column dtypes, arrow is
+# uncompressed Arrow IPC that is memory-mapped rather than read (see read_frame)
+TABLE_FORMATS = ['arrow', 'parquet', 'feather', 'csv']
+
+# column the DataFrame index is stored under in the columnar formats
+INDEX_COL = '__index__'
+
+
+def table_path(data_dir: str, file: str, format: str) -> str:
+    '''
+    Path of a table file in another format, e.g. players.csv -> players.parquet
+    '''
+    return os.path.join(data_dir, f'{os.path.splitext(file)[0]}.{format}')
+
+
+def stored_format(data_dir: str, file: str) -> str or None:
+    '''
+    The format a table was last written in, None if it is not stored at all
+    '''
+    stored = [
+        (os.path.getmtime(table_path(data_dir, file, format)), -rank, format)
+        for rank, format in enumerate(TABLE_FORMATS)
+        if os.path.exists(table_path(data_dir, file, format))
+    ]
+    return max(stored)[2] if stored else None
+
+
+def read_frame(path: str, format: str, index: bool) -> pd.DataFrame:
+    '''
+    Reads a stored table. Numeric columns of an arrow table without missing values are not
+    copied: they stay backed by the mapped file, so they are read-only and every process that
+    opens the table shares the same pages.
+    '''
+    if format == 'csv':
+        return pd.read_csv(path, index_col=0 if index else None)
+    if format == 'arrow':
+        df = feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+    else:
+        df = pd.read_parquet(path) if format == 'parquet' else pd.read_feather(path)
+    if index:
+        df = df.set_index(INDEX_COL).rename_axis(None)
+    return df
+
+
+def write_frame(df: pd.DataFrame, path: str, format: str, index: bool):
+    '''
+    Writes a table through a temp file, so readers never see a partly written one (and
+    processes that have the old file mapped keep reading the old file)
+    '''
+    tmp_path = f'{path}.tmp'
+    if format == 'csv':
+        df.to_csv(tmp_path, index=index)
+    else:
+        df = arrow_safe(df.rename_axis(INDEX_COL).reset_index() if index else df)
+        if format == 'parquet':
+            df.to_parquet(tmp_path, index=False)
+        elif format == 'arrow':
+            # a single record batch, so mapped columns are contiguous and need no concatenating
+            feather.write_feather(df, tmp_path, compression='uncompressed', chunksize=max(len(df), 1))
+        else:
+            df.to_feather(tmp_path)
+    os.replace(tmp_path, path)
@@ -0,0 +1,151 @@
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+
+
+class TableBuffer:
+    '''
+    Append-only buffer for a scraped table. Appended chunks are kept as a list and concatenated
+    once when the frame is materialized, instead of copying the whole accumulated frame on every
+    append the way a pd.concat inside a scrape loop does.
+    '''
+
+    def __init__(self, cols: list, df: pd.DataFrame = None):
+        self.cols = list(cols)
+        self._chunks = []
+        self._starts = []
+        self._rows = 0
+        self._frame = None
+        self._framed_chunks = 0
+        if df is not None:
+            self.append(df)
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def append(self, df: pd.DataFrame):
+        if len(df):
+            self._chunks.append(df)
+            self._starts.append(self._rows)
+            self._rows += len(df)
+
+    def mark(self) -> int:
+        '''
+        Position to pass to frame(since=...) or rollback() later
+        '''
+        return len(self._chunks)
+
+    def rollback(self, mark: int):
+        '''
+        Drops every chunk appended after a mark
+        '''
+        for df in self._chunks[mark:]:
+            self._rows -= len(df)
+        del self._chunks[mark:]
+        del self._starts[mark:]
+        if self._framed_chunks > mark:
+            self._frame = None
+            self._framed_chunks = 0
+
+    def project(self, cols: list, since: int = 0):
+        '''
+        Drops all but `cols` from the chunks appended since a mark, for buffers that are only kept
+        around for lookups once their rows have been written out
+        '''
+        self._chunks[since:] = [df[cols] for df in self._chunks[since:]]
+        if since == 0:
+            self.cols = list(cols)
+        if self._framed_chunks > since:
+            self._frame = None
+            self._framed_chunks = 0
+
+    def frame(self, since: int = 0) -> pd.DataFrame:
+        '''
+        Materializes the buffered rows, or only the chunks appended since a mark. The full frame
+        is cached and only newly appended chunks are concatenated onto it.
+        '''
+        if since:
+            return pd.concat([pd.DataFrame(columns=self.cols)] + self._chunks[since:], ignore_index=True)
+        if self._frame is None or self._framed_chunks != len(self._chunks):
+            head = self._frame if self._frame is not None else pd.DataFrame(columns=self.cols)
+            self._frame = pd.concat([head] + self._chunks[self._framed_chunks:], ignore_index=True)
+            self._framed_chunks = len(self._chunks)
+        return self._frame
+
+    def take(self, ranges: list) -> pd.DataFrame:
+        '''
+        Rows at the given [start, stop) positions, sliced from the chunks holding them without
+        materializing the whole buffer
+        '''
+        parts = [pd.DataFrame(columns=self.cols)]
+        for start, stop in ranges:
+            i = bisect_right(self._starts, start) - 1
+            while start < stop:
+                chunk_start = self._starts[i]
+                end = min(stop, chunk_start + len(self._chunks[i]))
+                parts.append(self._chunks[i].iloc[start - chunk_start:end - chunk_start])
+                start = end
+                i += 1
+        return pd.concat(parts, ignore_index=True)
+
+
+class PlayerRegistry:
+    '''
+    Hash index of scraped players, mapping each player id to the [start, stop) row ranges of their
+    games in the player game table. Membership and per-player lookups are O(1) instead of a scan of
+    the accumulated frames. A resumed scrape rebuilds it from the restored frames with from_frame.
+    '''
+
+    def __init__(self, rows: dict = None, game_rows: int = 0):
+        self._rows = rows or {}
+        self._order = list(self._rows)
+        self.game_rows = game_rows
+
+    def __contains__(self, player_id: str) -> bool:
+        return player_id in self._rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, player_id: str, start: int, stop: int):
+        if player_id not in self._rows:
+            self._rows[player_id] = []
+            self._order.append(player_id)
+        if stop > start:
+            self._rows[player_id].append((start, stop))
+        self.game_rows = max(self.game_rows, stop)
+
+    def rows(self, player_id: str) -> list:
+        return self._rows.get(player_id, [])
+
+    def mark(self) -> tuple:
+        return len(self._order), self.game_rows
+
+    def rollback(self, mark: tuple):
+        '''
+        Forgets every player added after a mark
+        '''
+        players, self.game_rows = mark
+        for player_id in self._order[players:]:
+            del self._rows[player_id]
+        del self._order[players:]
+
+    @classmethod
+    def from_frame(cls, player_df: pd.DataFrame, player_game_df: pd.DataFrame) -> 'PlayerRegistry':
+        '''
+        Builds the index with one pass over the player column, grouping consecutive rows of the
+        same player into a range
+        '''
+        registry = cls()
+        for player_id in player_df.id:
+            registry.add(player_id, 0, 0)
+        ids = player_game_df.player.to_numpy()
+        bounds = np.flatnonzero(ids[1:] != ids[:-1]) + 1
+        starts = [0, *bounds.tolist()]
+        stops = [*bounds.tolist(), len(ids)]
+        for start, stop in zip(starts, stops):
+            if stop > start:
+                registry.add(ids[start], start, stop)
+        registry.game_rows = len(ids)
+        return registry
@@ -0,0 +1,51 @@
+import time
+from datetime import date
+
+from cache import DAY, HOUR, PageCache, classify_url, current_season
+
+PFR = 'https://www.pro-football-reference.com'
+
+
+def test_classify_url():
+    assert classify_url(f'{PFR}/players/A/AlleJo02/gamelog/') == ('player_gamelog', None)
+    assert classify_url(f'{PFR}/players/A/AlleJo02.htm') == ('player', None)
+    assert classify_url(f'{PFR}/teams/buf/2021/gamelog/') == ('team_gamelog', 2021)
+    assert classify_url(f'{PFR}/teams/buf/2021_roster.htm') == ('team_roster', 2021)
+    assert classify_url(f'{PFR}/teams/buf/coaches.htm') == ('team_coaches', None)
+    assert classify_url(f'{PFR}/awards/awards_2021.htm') == ('awards', 2021)
+    assert classify_url(f'{PFR}/friv/birthdays.cgi') == ('other', None)
+
+
+def test_current_season_rolls_over_in_march():
+    assert current_season(date(2022, 2, 13)) == 2021
+    assert current_season(date(2022, 3, 1)) == 2022
+
+
+def test_pages_of_completed_seasons_never_expire(tmp_path):
+    cache = PageCache(str(tmp_path), ttls={'team_roster': HOUR})
+    season = current_season()
+    assert cache.ttl(f'{PFR}/teams/buf/{season - 1}_roster.htm') is None
+    assert cache.ttl(f'{PFR}/teams/buf/{season}_roster.htm') == HOUR
+    assert cache.ttl(f'{PFR}/teams/buf/coaches.htm') == DAY
+    assert cache.ttl(f'{PFR}/friv/birthdays.cgi') == cache.ttls['other']
+
+
+def test_expired_pages_are_only_served_stale(tmp_path):
+    cache = PageCache(str(tmp_path))
+    url = f'{PFR}/players/A/AlleJo02.htm'
+    entry = cache.put(url, b'<html></html>')
+    assert cache.get(url) == b'<html></html>'
+    assert not cache.is_fresh(entry, now=entry['fetched_at'] + cache.ttl(url))
+
+    cache.ttls['player'] = 0
+    assert cache.get(url) is None
+    assert cache.get(url, stale=True) == b'<html></html>'
+
+
+def test_identical_pages_are_stored_once(tmp_path):
+    cache = PageCache(str(tmp_path))
+    first = cache.put(f'{PFR}/players/A/AlleJo02.htm', b'<html></html>')
+    second = cache.put(f'{PFR}/players/K/KuppCo00.htm', b'<html></html>')
+    assert first['sha256'] == second['sha256']
+    assert len(list((tmp_path / 'pages').rglob('*.html.gz'))) == 1
+    assert [entry['url_class'] for entry in cache.entries('player')] == ['player', 'player']
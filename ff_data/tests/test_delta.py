@@ -0,0 +1,30 @@
+import pandas as pd
+
+from data import DELTA_KEYS, merge_rows
+
+
+def test_merge_rows_is_idempotent():
+    # stored rows come back from csv as text, scraped rows do not
+    stored = pd.DataFrame({
+        'player': ['AlleJo02', 'AlleJo02'],
+        'date': ['2021-09-12', '2021-09-19'],
+        'txn_type': ['signed', 'signed']
+    })
+    scraped = pd.DataFrame({
+        'player': ['AlleJo02', 'AlleJo02'],
+        'date': pd.to_datetime(['2021-09-19', '2021-10-03']),
+        'txn_type': ['signed', 'traded']
+    })
+    merged = merge_rows(stored, scraped, DELTA_KEYS['transactions'])
+    assert len(merged) == 3
+    assert list(merged.txn_type.astype(str)) == ['signed', 'signed', 'traded']
+    assert merge_rows(merged, scraped, DELTA_KEYS['transactions']).equals(merged)
+    assert merge_rows(merged, merged, DELTA_KEYS['transactions']).equals(merged)
+
+
+def test_merge_rows_replaces_rows_with_the_same_key():
+    stored = pd.DataFrame({'team': ['buf', 'buf'], 'year': [2021, 2021], 'player': ['AlleJo02', 'DiggSt00']})
+    stored['position'] = ['QB', 'WR']
+    scraped = stored.iloc[[1]].assign(position='RB')
+    merged = merge_rows(stored, scraped, DELTA_KEYS['rosters'])
+    assert list(merged.position.astype(str)) == ['QB', 'RB']
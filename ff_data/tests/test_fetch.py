@@ -0,0 +1,22 @@
+import threading
+
+from fetch import RateController
+
+
+def test_pause_longer_than_breaker_cooldown():
+    '''
+    A 429 pause that outlasts the cooldown of the circuit it opened must not leave acquire()
+    waiting on the probe it claimed itself
+    '''
+    limiter = RateController(rate=100, breaker_threshold=1, breaker_cooldown=0.5)
+    limiter.throttled(retry_after=1.5)
+    assert limiter.opened_at is not None
+
+    caller = threading.Thread(target=limiter.acquire, daemon=True)
+    caller.start()
+    caller.join(timeout=5)
+    assert not caller.is_alive()
+    assert limiter.probing
+
+    limiter.success()
+    assert limiter.opened_at is None and not limiter.probing
@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from journal import ScrapeJournal
+
+
+def test_modes_do_not_share_a_journal(tmp_path):
+    ScrapeJournal(str(tmp_path), 'master').add([('buf', 2021, 'games')])
+    assert ScrapeJournal(str(tmp_path), 'master').status('buf', 2021, 'games') == 'pending'
+    with pytest.raises(ValueError):
+        ScrapeJournal(str(tmp_path), 'sharded')
+
+
+def test_resume_reruns_only_the_failed_unit(tmp_path):
+    calls = []
+
+    def scrape(unit, fail=False):
+        def run():
+            calls.append(unit)
+            if fail:
+                raise ValueError(unit)
+            return {'rows': pd.DataFrame({'unit': [unit]})}
+        return run
+
+    journal = ScrapeJournal(str(tmp_path), 'master', max_attempts=2)
+    journal.add([('buf', 2021, 'games'), ('mia', 2021, 'games')])
+    journal.run('buf', 2021, 'games', scrape('buf'))
+    assert journal.run('mia', 2021, 'games', scrape('mia', fail=True)) is None
+    assert list(journal.failed().team) == ['mia']
+
+    # a restarted scrape skips the done unit and retries the failed one
+    journal = ScrapeJournal(str(tmp_path), 'master', max_attempts=2)
+    assert journal.run('buf', 2021, 'games', scrape('buf')) is None
+    journal.run('mia', 2021, 'games', scrape('mia'))
+    assert calls == ['buf', 'mia', 'mia']
+    assert journal.failed().empty
+    assert list(journal.load({'rows': ['unit']})['rows'].unit) == ['buf', 'mia']
+
+
+def test_failed_units_stop_after_max_attempts(tmp_path):
+    journal = ScrapeJournal(str(tmp_path), 'master', max_attempts=1)
+
+    def fail():
+        raise ValueError('404')
+
+    journal.run('buf', 2021, 'games', fail)
+    assert not journal.is_runnable('buf', 2021, 'games')
+    journal.retry_failed()
+    assert journal.is_runnable('buf', 2021, 'games')
@@ -0,0 +1,36 @@
+import os
+from multiprocessing import Pool
+
+import pandas as pd
+
+from data import FFData, read_table, write_table
+from keys import MISSING_KEY, load_keymaps
+
+
+def write_rosters(args):
+    csv_dir, players = args
+    write_table('rosters', pd.DataFrame({'team': 'buf', 'player': players}), csv_dir, 'csv')
+
+
+def test_concurrent_writers_never_share_keys(tmp_path):
+    csv_dir = str(tmp_path)
+    batches = [(csv_dir, [f'P{i}{j}' for j in range(50)]) for i in range(6)]
+    with Pool(3) as pool:
+        pool.map(write_rosters, batches)
+    keymap = load_keymaps(csv_dir)['player']
+    ids = [player for _, players in batches for player in players]
+    assert len(keymap) == len(ids)
+    assert sorted(keymap.decode(keymap.encode(ids))) == sorted(ids)
+
+
+def test_reading_hands_out_no_keys(tmp_path):
+    csv_dir = str(tmp_path)
+    pd.DataFrame({'team': ['buf'], 'player': ['AlleJo02']}).to_csv(tmp_path / 'rosters.csv', index=False)
+    rosters = FFData(csv_dir, keys=True).rosters
+    assert (rosters.player_key == MISSING_KEY).all()
+    assert sorted(os.listdir(csv_dir)) == ['rosters.csv']
+
+    write_table('rosters', read_table('rosters', csv_dir), csv_dir)
+    ffdata = FFData(csv_dir, keys=True)
+    assert list(ffdata.label('player', ffdata.rosters.player_key)) == ['AlleJo02']
+    assert list(FFData(csv_dir).rosters.columns) == ['team', 'player']
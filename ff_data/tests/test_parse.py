@@ -0,0 +1,50 @@
+import math
+
+from bs4 import BeautifulSoup
+
+from parse import Col, CommentIndex, extract_row, row_cells
+
+GAME_ROW = (
+    '<tr id="stats.410"><th data-stat="ranker">1</th><td data-stat="year_id">2021</td>'
+    '<td data-stat="game_date">2021-09-12</td><td data-stat="team"><a href="/teams/buf/2021.htm">BUF</a></td>'
+    '<td data-stat="game_location">@</td><td data-stat="gs"></td><td data-stat="pass_cmp">30</td>'
+    '<td data-stat="pass_att"></td><td data-stat="pass_rating">n/a</td>'
+    '<td data-stat="pass_cmp"><span>nested</span></td></tr>'
+)
+
+
+def test_comment_index_keys_ids_to_the_comment_defining_them():
+    html = (
+        '<html><body>'
+        '<!-- <a href="#div_transactions">Transactions</a> -->'
+        '<div id="all_transactions"><!-- <div id="div_transactions"><div class="news_stories">'
+        '<ul><li>traded</li></ul></div></div> --></div>'
+        '</body></html>'
+    )
+    comments = CommentIndex(BeautifulSoup(html, features='lxml'))
+    assert 'news_stories' in comments.comment('div_transactions')
+    assert comments.soup('div_transactions').find('div', class_='news_stories') is not None
+    assert comments.comment('div_combine') is None
+
+
+def test_cols_read_a_pfr_row():
+    cells = row_cells(BeautifulSoup(f'<table>{GAME_ROW}</table>', features='lxml').tr)
+    # the first cell of a data-stat wins
+    assert cells['pass_cmp'].get_text() == '30'
+    assert 'ranker' in cells
+    row = extract_row(cells, {
+        'year': Col('year_id', int),
+        'team': Col('team', str.lower, href=2),
+        'home': Col('game_location', lambda text: text != '@', blank=True),
+        'start': Col('gs', lambda text: text == '*', blank=False),
+        'pass_att': Col('pass_att', int, 0),
+        'qb_rate': Col('pass_rating', float, 0.),
+        'rush_att': Col('rush_att', int, 0),
+        'opp': Col('opp', str.lower, href=2)
+    })
+    assert row['year'] == 2021 and row['team'] == 'buf'
+    assert row['home'] is False and row['start'] is False
+    # blank, unconvertible and missing cells
+    assert row['pass_att'] == 0 and row['qb_rate'] == 0. and row['rush_att'] == 0
+    assert math.isnan(row['opp'])
+    assert math.isnan(Col('game_date', attr='csk').extract(cells))
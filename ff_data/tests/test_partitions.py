@@ -0,0 +1,17 @@
+import os
+
+import pandas as pd
+
+from partitions import PartitionWriter, read_partitions
+
+
+def test_empty_partitions_are_kept_on_request(tmp_path):
+    writer = PartitionWriter(str(tmp_path))
+    empty = pd.DataFrame({'player': pd.Series([], dtype=object), 'year': pd.Series([], dtype='int16')})
+    writer.write('all_pros', empty, 'nfl', 2019)
+    assert not os.path.exists(writer.path('all_pros', 'nfl', 2019))
+    writer.write('all_pros', empty, 'nfl', 2019, keep_empty=True)
+    writer.write('all_pros', pd.DataFrame({'player': ['A1'], 'year': [2020]}), 'nfl', 2020)
+    assert os.path.exists(writer.path('all_pros', 'nfl', 2019))
+    df = read_partitions(str(tmp_path), 'all_pros', ['player', 'year'])
+    assert df.player.tolist() == ['A1']
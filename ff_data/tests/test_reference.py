@@ -0,0 +1,53 @@
+import os
+
+import data
+from fetch import Fetcher
+from parse import ParsePool
+
+PFR = 'https://www.pro-football-reference.com'
+
+
+def pro_bowl_page(*players) -> bytes:
+    rows = ''.join(
+        f'<tr><td data-stat="player"><a href="/players/{player[0]}/{player}.htm">{player}</a></td></tr>'
+        for player in players
+    )
+    return f'<html><body><table id="pro_bowl"><tbody><tr class="thead"><th>Player</th></tr>{rows}</tbody></table></body></html>'.encode()
+
+
+class Pages(dict):
+    '''
+    Fixture page source that records the urls it serves
+    '''
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.served = []
+
+    def get(self, url, default=None):
+        self.served.append(url)
+        return super().get(url, default)
+
+
+def test_reference_seasons_are_partitioned_once(tmp_path):
+    pages = Pages({
+        f'{PFR}/years/2019/probowl.htm': pro_bowl_page(),
+        f'{PFR}/years/2020/probowl.htm': pro_bowl_page('AlleJo02', 'KuppCo00')
+    })
+    ref_dir = str(tmp_path)
+    fetcher = data.set_fetcher(Fetcher(source=pages))
+    pool = data.set_parse_pool(ParsePool(0))
+    try:
+        pro_bowls = data.get_pro_bowls(2018, 2020, ref_dir=ref_dir)
+        assert pro_bowls.player.tolist() == ['AlleJo02', 'KuppCo00']
+        assert pro_bowls.year.dtype == 'int16'
+        # the empty 2019 season is kept as a partition, the missing 2018 page is not
+        partitions = sorted(os.listdir(os.path.join(ref_dir, 'pro_bowls')))
+        assert len(partitions) == 2 and '2018' not in ''.join(partitions)
+
+        served = len(pages.served)
+        assert data.get_pro_bowls(2018, 2020, ref_dir=ref_dir).equals(pro_bowls)
+        assert pages.served[served:] == [f'{PFR}/years/2018/probowl.htm']
+    finally:
+        data.set_fetcher(fetcher)
+        data.set_parse_pool(pool)
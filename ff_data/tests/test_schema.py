@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from schema import apply_schema, cast_column
+
+
+def test_narrow_ints_widen_instead_of_wrapping():
+    assert cast_column(pd.Series(['12', '-3']), 'int8').dtype == 'int8'
+    values = cast_column(pd.Series(['12', '300']), 'int8')
+    assert values.dtype == 'int16'
+    assert list(values) == [12, 300]
+    values = cast_column(pd.Series([12, None, 70000]), 'int16')
+    assert values.dtype == 'Int32'
+    assert list(values.fillna(0)) == [12, 0, 70000]
+
+
+def test_missing_values_fall_back_to_nullable_dtypes():
+    assert cast_column(pd.Series(['1', '']), 'int8').dtype == 'Int8'
+    assert cast_column(pd.Series([True, None]), 'bool').dtype == 'boolean'
+    assert cast_column(pd.Series(['True', 'False']), 'bool').dtype == bool
+
+
+def test_decimals_keep_their_values():
+    df = apply_schema(pd.DataFrame({'qb_rate': ['79.3', '158.3'], 'forty': [4.41, np.nan]}))
+    assert list(df.qb_rate) == [79.3, 158.3]
+    assert df.forty[0] == 4.41
+
+
+def test_columns_with_their_dtype_are_not_copied():
+    series = pd.Series([1, 2], dtype='int16')
+    assert cast_column(series, 'int16') is series
+    dates = cast_column(pd.Series(['2021-09-12', 'x']), 'datetime64[ns]')
+    assert dates.dtype == 'datetime64[ns]' and dates.isna().tolist() == [False, True]
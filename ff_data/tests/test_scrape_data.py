@@ -0,0 +1,29 @@
+from bs4 import BeautifulSoup
+
+from data import parse_scrape_data_seasons
+
+SEASON_CELLS = (
+    '<th data-stat="year_id" csk="{year}">{year}</th><td data-stat="age">25</td>'
+    '<td data-stat="team"><a href="/teams/buf/{year}.htm">BUF</a></td>'
+    '<td data-stat="g">16</td><td data-stat="gs">16</td>'
+)
+
+PAGE = f'''
+<table id="passing"><tbody>
+<tr>{SEASON_CELLS.format(year=2020)}<td data-stat="pass_att">572</td><td data-stat="av">17</td></tr>
+<tr>{SEASON_CELLS.format(year=2021)}<td data-stat="pass_att">646</td><td data-stat="av">n/a</td></tr>
+<tr>{SEASON_CELLS.format(year=2022)}<td data-stat="pass_att">567</td><td data-stat="av"></td></tr>
+</tbody></table>
+<table id="rushing_and_receiving"><tbody>
+<tr>{SEASON_CELLS.format(year=2020)}<td data-stat="rush_att">102</td></tr>
+</tbody></table>
+'''
+
+
+def test_season_av():
+    seasons = {season['year']: season for season in parse_scrape_data_seasons(BeautifulSoup(PAGE, 'html.parser'), 'AlleJo02')}
+    # a table without an av cell leaves the value of an earlier table alone
+    assert seasons[2020]['pfr_av'] == 17
+    assert seasons[2020]['rush_att'] == 102
+    assert seasons[2021]['pfr_av'] == 0
+    assert seasons[2022]['pfr_av'] == 0
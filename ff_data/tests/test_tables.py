@@ -0,0 +1,18 @@
+import pandas as pd
+
+from tables import PlayerRegistry
+
+
+def test_registry_rows_follow_frame_order():
+    '''
+    Ranges come from the restored frame itself, so a retried unit that lands after later units
+    still maps every player to their own games
+    '''
+    players = pd.DataFrame({'id': ['b', 'a', 'c']})
+    games = pd.DataFrame({'player': ['b', 'b', 'a', 'c', 'c', 'c'], 'week_num': [1, 2, 3, 1, 2, 3]})
+    registry = PlayerRegistry.from_frame(players, games)
+    for player_id in players.id:
+        rows = pd.concat([games.iloc[start:stop] for start, stop in registry.rows(player_id)])
+        assert (rows.player == player_id).all()
+    assert registry.rows('a') == [(2, 3)]
+    assert registry.game_rows == len(games)